@@ -0,0 +1,124 @@
+import asyncio
+from collections import Counter
+
+import numpy as np
+
+# -------------------------------
+# DYNAMIC MICRO-BATCHING
+# -------------------------------
+# Concurrent single-row /predict calls for the same model are held for at
+# most `max_wait_ms` (or until `max_batch_size` rows are waiting), scored in
+# one vectorized call, and each caller gets its own row back. `score` is an
+# async callable X -> (labels, probabilities). Up to `max_in_flight` batches
+# are scored at once (the pool's per-model concurrency), so the next batch
+# gathers while earlier ones are still scoring. At most `max_queued` rows wait
+# (0 = unbounded); past that submit raises asyncio.QueueFull right away,
+# since the pool behind the batcher never sees the backlog to reject it.
+
+
+class MicroBatcher:
+    def __init__(self, score, max_batch_size: int = 64, max_wait_ms: float = 2.0, max_in_flight: int = 1,
+                 max_queued: int = 0):
+        self.score = score
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+
+        self.batches = 0
+        self.rows = 0
+        self.size_counts = Counter()
+        self.rejected = 0
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._flushes = set()
+
+    async def submit(self, row):
+        """Queue one feature row; resolves to (label, probability or None). Raises asyncio.QueueFull."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First call, or the app was restarted on a new event loop
+            self._loop = loop
+            self._queue = asyncio.Queue(self.max_queued)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._worker = loop.create_task(self._run())
+
+        fut = loop.create_future()
+        try:
+            self._queue.put_nowait((row, fut))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        return await fut
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Wait for a free slot (rows keep queueing meanwhile), then score in the background
+            await self._slots.acquire()
+            task = self._loop.create_task(self._flush_in_slot(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush_in_slot(self, batch):
+        try:
+            await self._flush(batch)
+        finally:
+            self._slots.release()
+
+    async def _flush(self, batch):
+        self.batches += 1
+        self.rows += len(batch)
+        self.size_counts[len(batch)] += 1
+
+        # A malformed row only fails callers with the same row width
+        groups = {}
+        for row, fut in batch:
+            groups.setdefault(len(row), []).append((row, fut))
+
+        for items in groups.values():
+            X = np.vstack([row for row, _ in items])
+            try:
+                preds, probs = await self.score(X)
+            except Exception as e:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for i, (_, fut) in enumerate(items):
+                if not fut.done():
+                    fut.set_result((int(preds[i]), float(probs[i]) if probs is not None else None))
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": len(self._flushes),
+            "max_queued": self.max_queued,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "batch_size_counts": dict(sorted(self.size_counts.items())),
+        }
@@ -0,0 +1,173 @@
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# -------------------------------
+# PREDICTION RESULT CACHE
+# -------------------------------
+# Rows are keyed by a 64-bit digest of their float32 bytes, computed for the
+# whole batch with vectorized uint64 arithmetic, inside a namespace of model
+# name + version + threshold. Only the misses reach the model.
+
+_MULT = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def row_digests(X):
+    """One uint64 digest per row of X, over the row's float32 bytes."""
+    words = np.ascontiguousarray(X, dtype=np.float32).view(np.uint32).astype(np.uint64)
+    h = np.full(words.shape[0], np.uint64(words.shape[1]), dtype=np.uint64)
+    for j in range(words.shape[1]):
+        # splitmix64-style mixing of each 32-bit word into the running hash
+        h = (h ^ words[:, j]) * _MULT
+        h ^= h >> np.uint64(31)
+        h *= _MIX1
+        h ^= h >> np.uint64(27)
+        h *= _MIX2
+    return h
+
+
+# -------------------------------
+# BACKENDS
+# -------------------------------
+class MemoryBackend:
+    def __init__(self, max_items=200_000):
+        self.max_items = max_items
+        # Oldest write first; with one TTL that is also the soonest to expire
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, namespace, digests):
+        now = time.monotonic()
+        data = self._data
+        out = []
+        for d in digests.tolist():
+            hit = data.get((namespace, d))
+            out.append(hit[1:] if hit is not None and hit[0] > now else None)
+        return out
+
+    def set_many(self, namespace, digests, labels, probs, ttl):
+        expires = time.monotonic() + ttl
+        now = time.monotonic()
+        with self._lock:
+            data = self._data
+            for d, label, prob in zip(digests.tolist(), labels.tolist(), probs.tolist()):
+                key = (namespace, d)
+                data[key] = (expires, label, prob)
+                data.move_to_end(key)
+            # Drop expired entries from the front, then the oldest over the limit
+            while data and next(iter(data.values()))[0] <= now:
+                data.popitem(last=False)
+            for _ in range(len(data) - self.max_items):
+                data.popitem(last=False)
+
+
+class LocalKV:
+    """In-process stand-in for a Redis client (mget / set with ex=), for dev and tests."""
+
+    def __init__(self):
+        self._data = {}
+
+    def mget(self, keys):
+        now = time.monotonic()
+        out = []
+        for k in keys:
+            hit = self._data.get(k)
+            out.append(hit[1] if hit is not None and (hit[0] is None or hit[0] > now) else None)
+        return out
+
+    def set(self, key, value, ex=None):
+        self._data[key] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+
+class SharedBackend:
+    # label int8 + probability float64 per key
+    _VALUE = struct.Struct("<bd")
+
+    def __init__(self, client, prefix="fraud"):
+        self.client = client
+        self.prefix = prefix
+
+    def _keys(self, namespace, digests):
+        return [f"{self.prefix}:{namespace}:{d:016x}" for d in digests.tolist()]
+
+    def get_many(self, namespace, digests):
+        values = self.client.mget(self._keys(namespace, digests))
+        return [self._VALUE.unpack(v) if v is not None else None for v in values]
+
+    def set_many(self, namespace, digests, labels, probs, ttl):
+        pipe = self.client.pipeline() if hasattr(self.client, "pipeline") else self.client
+        for key, label, prob in zip(self._keys(namespace, digests), labels.tolist(), probs.tolist()):
+            pipe.set(key, self._VALUE.pack(label, prob), ex=max(1, int(ttl)))
+        if pipe is not self.client:
+            pipe.execute()
+
+
+def build_backend(kind, url=None, max_items=200_000):
+    if kind == "memory":
+        return MemoryBackend(max_items)
+    if kind == "local":
+        return SharedBackend(LocalKV())
+    if kind == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESULT_CACHE=redis requires the 'redis' package.")
+        return SharedBackend(redis.Redis.from_url(url))
+    raise ValueError(f"Unknown result cache backend: {kind}")
+
+
+# -------------------------------
+# CACHE
+# -------------------------------
+class ResultCache:
+    def __init__(self, backend, ttl=300.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = {}
+        self.misses = {}
+
+    async def score(self, model_name, scorer, X, compute):
+        """Serve cached rows of X and `await compute(X_missing)` for the rest."""
+        namespace = f"{model_name}:{scorer.version}:{scorer.threshold}"
+        digests = row_digests(X)
+        found = self.backend.get_many(namespace, digests)
+
+        miss = np.fromiter((f is None for f in found), dtype=bool, count=len(found))
+        n_miss = int(miss.sum())
+        self.hits[model_name] = self.hits.get(model_name, 0) + len(found) - n_miss
+        self.misses[model_name] = self.misses.get(model_name, 0) + n_miss
+
+        labels = np.empty(len(found), dtype=np.int64)
+        probs = np.empty(len(found), dtype=np.float64)
+        if n_miss < len(found):
+            cached = np.array([f for f in found if f is not None], dtype=np.float64).reshape(-1, 2)
+            labels[~miss] = cached[:, 0]
+            probs[~miss] = cached[:, 1]
+
+        if n_miss:
+            new_labels, new_probs = await compute(X[miss])
+            if new_probs is None:
+                new_probs = np.full(n_miss, np.nan)
+            labels[miss] = new_labels
+            probs[miss] = new_probs
+            self.backend.set_many(namespace, digests[miss], labels[miss], probs[miss], self.ttl)
+
+        return labels, (probs if scorer.has_proba else None)
+
+    def stats(self):
+        models = set(self.hits) | set(self.misses)
+        out = {}
+        for name in sorted(models):
+            hits, misses = self.hits.get(name, 0), self.misses.get(name, 0)
+            out[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+        return {"backend": type(self.backend).__name__, "ttl_seconds": self.ttl, "models": out}
@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+from fastapi import HTTPException
+
+# -------------------------------
+# TWO-STAGE CASCADE
+# -------------------------------
+# Every row is scored by the cheap screening model; only rows whose fraud
+# probability lands in the uncertainty band [low, high) are sent on to the
+# expensive model. Below the band a row is legitimate, above it fraud. The
+# band is calibrated by src/train.py (or `python -m src.cascade`) for a
+# target recall loss and saved next to the models as cascade.json.
+
+
+class Cascade:
+    def __init__(self, path, low=None, high=None):
+        self.path = path
+        # Env overrides for the calibrated band (None = use the file)
+        self.low_override = low
+        self.high_override = high
+
+        self._config = None
+        self._mtime = None
+        self.rows = 0
+        self.escalated = 0
+
+    def config(self):
+        """Band + member names, re-read when cascade.json changes; 404 if not calibrated."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != self._mtime:
+            with open(self.path) as f:
+                self._config = json.load(f)
+            self._mtime = mtime
+
+        config = dict(self._config or {"screen": "logreg", "escalate": "rf"})
+        if self.low_override is not None:
+            config["low"] = self.low_override
+        if self.high_override is not None:
+            config["high"] = self.high_override
+        if "low" not in config or "high" not in config:
+            raise HTTPException(
+                status_code=404,
+                detail="Cascade is not calibrated: train both models with src/train.py or run src.cascade.",
+            )
+        return config
+
+    async def score(self, X, score_rows):
+        """(labels, probabilities, rows escalated); score_rows(name, X) scores with a member model."""
+        config = self.config()
+        low, high = config["low"], config["high"]
+
+        labels, probs = await score_rows(config["screen"], X)
+        if probs is None:
+            raise HTTPException(status_code=500, detail="Cascade screening model has no predict_proba.")
+
+        escalate = (probs >= low) & (probs < high)
+        labels = (probs >= high).astype(np.int64)
+        probs = np.array(probs, dtype=np.float64)
+
+        n = int(escalate.sum())
+        if n:
+            esc_labels, esc_probs = await score_rows(config["escalate"], X[escalate])
+            labels[escalate] = esc_labels
+            probs[escalate] = esc_probs if esc_probs is not None else np.nan
+
+        self.rows += len(X)
+        self.escalated += n
+        return labels, probs, n
+
+    def stats(self):
+        try:
+            config = self.config()
+        except HTTPException as e:
+            config = {"error": e.detail}
+        return {
+            "config": config,
+            "rows": self.rows,
+            "escalated": self.escalated,
+            "escalated_fraction": self.escalated / self.rows if self.rows else 0.0,
+        }
@@ -0,0 +1,106 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from fastapi import HTTPException
+
+# -------------------------------
+# INFERENCE EXECUTION LAYER
+# -------------------------------
+# All model calls go through one bounded thread or process pool. Each model
+# gets a concurrency limit and a bounded wait queue; when the queue is full
+# the request is rejected with 503 instead of piling up. Large batches are
+# scored in slices so small requests can interleave with them.
+
+
+def _score_in_process(model_name, version, X):
+    # Runs in a pool worker: models are loaded (or fork-inherited) per process
+    # and reloaded when the parent has hot-swapped to a newer version
+    from backend.main import REGISTRY
+
+    return REGISTRY.get(model_name, version).score(X)
+
+
+class InferencePool:
+    def __init__(self, kind="thread", workers=4, model_concurrency=None, queue_limit=64, chunk_rows=4000):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+
+        self.kind = kind
+        self.workers = workers
+        self.model_concurrency = model_concurrency or workers
+        self.queue_limit = queue_limit
+        self.chunk_rows = chunk_rows
+
+        if kind == "process":
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+
+        self._limits = {}
+        self.in_flight = {}
+        self.running = {}
+        self.rejected = {}
+
+    def _semaphore(self, model_name):
+        loop = asyncio.get_running_loop()
+        sem, sem_loop = self._limits.get(model_name, (None, None))
+        if sem_loop is not loop:
+            sem = asyncio.Semaphore(self.model_concurrency)
+            self._limits[model_name] = (sem, loop)
+        return sem
+
+    def reject(self, model_name):
+        """Count a rejection for model_name and return the 503 to raise."""
+        self.rejected[model_name] = self.rejected.get(model_name, 0) + 1
+        return HTTPException(
+            status_code=503,
+            detail=f"Inference queue for '{model_name}' is full, retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    async def run(self, model_name, scorer, X):
+        """Score X for model_name in the pool; raises 503 when the model's queue is full."""
+        if self.in_flight.get(model_name, 0) >= self.queue_limit:
+            raise self.reject(model_name)
+
+        self.in_flight[model_name] = self.in_flight.get(model_name, 0) + 1
+        try:
+            if len(X) <= self.chunk_rows:
+                return await self._run_slice(model_name, scorer, X)
+
+            parts = [
+                await self._run_slice(model_name, scorer, X[s:s + self.chunk_rows])
+                for s in range(0, len(X), self.chunk_rows)
+            ]
+            preds = np.concatenate([p for p, _ in parts])
+            probs = None if parts[0][1] is None else np.concatenate([q for _, q in parts])
+            return preds, probs
+        finally:
+            self.in_flight[model_name] -= 1
+
+    async def _run_slice(self, model_name, scorer, X):
+        if self.kind == "process":
+            fn = partial(_score_in_process, model_name, scorer.version, X)
+        else:
+            fn = partial(scorer.score, X)
+
+        async with self._semaphore(model_name):
+            self.running[model_name] = self.running.get(model_name, 0) + 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, fn)
+            finally:
+                self.running[model_name] -= 1
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "model_concurrency": self.model_concurrency,
+            "queue_limit": self.queue_limit,
+            "chunk_rows": self.chunk_rows,
+            "in_flight": dict(self.in_flight),
+            "running": dict(self.running),
+            "rejected": dict(self.rejected),
+        }
@@ -0,0 +1,145 @@
+import numpy as np
+
+# -------------------------------
+# COMPILED RANDOM FOREST
+# -------------------------------
+# Flattens every fitted tree of a RandomForestClassifier into one set of
+# contiguous node arrays and walks all trees for a whole batch at once,
+# instead of sklearn's per-tree Python dispatch. Past `fallback_rows` the
+# per-call dispatch is amortised and sklearn's Cython walk is faster, so big
+# batches go back to the wrapped forest.
+
+
+class CompiledForest:
+    # (tree, row) pairs walked per pass; keeps the working set cache-sized
+    PAIRS_PER_PASS = 65536
+    # descend this many levels between drops of finished (tree, row) pairs
+    COMPACT_EVERY = 4
+
+    def __init__(self, forest, fallback_rows: int = 1024):
+        trees = [est.tree_ for est in forest.estimators_]
+        counts = np.array([t.node_count for t in trees], dtype=np.intp)
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+
+        feature, threshold, children, value = [], [], [], []
+        for tree, off in zip(trees, offsets):
+            ids = np.arange(tree.node_count, dtype=np.intp) + off
+            is_leaf = tree.children_left == -1
+
+            # Leaves point to themselves, so extra steps past a leaf are no-ops.
+            # children[2*i] is taken when x > threshold, children[2*i + 1] when x <= threshold.
+            pair = np.empty((tree.node_count, 2), dtype=np.intp)
+            pair[:, 0] = np.where(is_leaf, ids, tree.children_right + off)
+            pair[:, 1] = np.where(is_leaf, ids, tree.children_left + off)
+            children.append(pair.ravel())
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+
+            # Same leaf output as DecisionTreeClassifier.predict_proba: older
+            # sklearn stores weighted counts here, newer stores fractions.
+            v = tree.value[:, 0, :].astype(np.float64)
+            if not np.allclose(v.sum(axis=1), 1.0):
+                normalizer = v.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0.0] = 1.0
+                v = v / normalizer
+            value.append(v)
+
+        # sklearn compares float32 features against float64 thresholds. Rounding
+        # each threshold down to the nearest float32 keeps every comparison
+        # identical while letting the walk stay in float32.
+        thr64 = np.concatenate(threshold)
+        thr32 = thr64.astype(np.float32)
+        over = thr32.astype(np.float64) > thr64
+        thr32[over] = np.nextafter(thr32[over], np.float32(-np.inf))
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = thr32
+        self.children = np.concatenate(children)
+        self.is_leaf = self.children[0::2] == np.arange(len(thr64), dtype=np.intp)
+        # (n_classes, n_nodes) so each class column is one contiguous gather
+        self.value = np.ascontiguousarray(np.concatenate(value).T)
+        self.roots = offsets
+
+        self.classes_ = np.asarray(forest.classes_)
+        self.n_features_in_ = int(forest.n_features_in_)
+        self.n_estimators = len(trees)
+        self.forest = forest
+        self.fallback_rows = fallback_rows
+        if hasattr(forest, "decision_threshold_"):
+            self.decision_threshold_ = forest.decision_threshold_
+
+    def __getstate__(self):
+        # Saved artifacts hold only the node arrays, so joblib.load(mmap_mode="r")
+        # maps them straight from disk; the sklearn fallback is in-process only.
+        state = self.__dict__.copy()
+        state["forest"] = None
+        return state
+
+    @property
+    def nbytes(self):
+        return sum(
+            a.nbytes
+            for a in (self.feature, self.threshold, self.children, self.is_leaf, self.value, self.roots)
+        )
+
+    def apply(self, X):
+        """Leaf node id reached in every tree, shape (n_estimators, n_samples)."""
+        X = self._validate(X)
+        n = X.shape[0]
+        flat = X.ravel()
+        leaves = np.empty((self.n_estimators, n), dtype=np.intp)
+        if n == 0:
+            return leaves
+
+        trees_per_pass = max(1, self.PAIRS_PER_PASS // n)
+        row_base = np.arange(n, dtype=np.intp) * self.n_features_in_
+
+        for t0 in range(0, self.n_estimators, trees_per_pass):
+            t1 = min(self.n_estimators, t0 + trees_per_pass)
+            node = np.repeat(self.roots[t0:t1], n)
+            rb = np.tile(row_base, t1 - t0)
+            active = np.arange(node.size, dtype=np.intp)
+            cur = node.copy()
+
+            step = 0
+            while active.size:
+                go_left = np.take(flat, rb + np.take(self.feature, cur)) <= np.take(self.threshold, cur)
+                cur = np.take(self.children, cur * 2 + go_left)
+                step += 1
+                if step % self.COMPACT_EVERY == 0:
+                    node[active] = cur
+                    live = ~np.take(self.is_leaf, cur)
+                    active, cur, rb = active[live], cur[live], rb[live]
+
+            leaves[t0:t1] = node.reshape(t1 - t0, n)
+        return leaves
+
+    def predict_proba(self, X):
+        if self.forest is not None and len(X) > self.fallback_rows:
+            return self.forest.predict_proba(X)
+
+        leaves = self.apply(X)
+        # Summed tree by tree, in estimator order, like sklearn's accumulation
+        proba = np.stack([np.take(v, leaves).sum(axis=0) for v in self.value], axis=1)
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def _validate(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected 2D input with {self.n_features_in_} features, got shape {X.shape}"
+            )
+        return X
+
+
+def compile_forest(model):
+    """Return a CompiledForest for a fitted RandomForestClassifier, else the model unchanged."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    if isinstance(model, RandomForestClassifier) and model.n_outputs_ == 1:
+        return CompiledForest(model)
+    return model
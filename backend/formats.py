@@ -0,0 +1,242 @@
+import io
+import json
+
+import numpy as np
+from fastapi import HTTPException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# -------------------------------
+# BINARY BATCH FORMATS
+# -------------------------------
+# /predict-batch negotiates its body by Content-Type. JSON stays the default;
+# .npy bodies are wrapped in place with np.frombuffer. Arrow IPC streams are
+# wrapped in place too when every column is one non-null chunk of the same
+# float type laid out at an even stride in the body (what a single-batch
+# writer produces); anything else is copied column by column. pyarrow is
+# optional.
+
+JSON_TYPE = "application/json"
+NPY_TYPE = "application/x-npy"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+FLOAT_DTYPES = (np.dtype("<f4"), np.dtype("<f8"))
+
+RESULT_DTYPE = np.dtype([("prediction", "<i8"), ("probability", "<f8")])
+
+# Feature width when the model does not report n_features_in_
+N_FEATURES = 30
+
+
+def media_format(content_type):
+    """Map a Content-Type / Accept header to 'npy', 'arrow' or 'json'."""
+    content_type = (content_type or "").lower()
+    if NPY_TYPE in content_type:
+        return "npy"
+    if ARROW_TYPE in content_type:
+        return "arrow"
+    return "json"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow IPC bodies require pyarrow on the server.")
+    return pa
+
+
+# -------------------------------
+# DECODE
+# -------------------------------
+def decode_npy(body: bytes):
+    buf = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(buf)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(buf)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(buf)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid .npy body: {e}")
+
+    if dtype not in FLOAT_DTYPES:
+        raise HTTPException(status_code=415, detail=f"Expected little-endian float32/float64 .npy, got {dtype.str}")
+
+    count = int(np.prod(shape))
+    if buf.tell() + count * dtype.itemsize > len(body):
+        raise HTTPException(status_code=400, detail="Truncated .npy body.")
+
+    # No copy: the array is a read-only view over the request bytes
+    X = np.frombuffer(body, dtype=dtype, count=count, offset=buf.tell())
+    return X.reshape(shape, order="F" if fortran_order else "C")
+
+
+def decode_arrow(body: bytes):
+    pa = _import_pyarrow()
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as e:
+        raise HTTPException(status_code=400, detail=f"Invalid Arrow IPC body: {e}")
+
+    if table.num_columns == 0:
+        raise HTTPException(status_code=400, detail="Arrow body has no columns.")
+
+    for j, col in enumerate(table.columns):
+        if not pa.types.is_floating(col.type) or col.null_count:
+            raise HTTPException(status_code=415, detail=f"Column {table.column_names[j]!r} must be non-null float.")
+
+    X = _arrow_view(table, body)
+    if X is not None:
+        return X
+
+    X = np.empty((table.num_rows, table.num_columns), dtype=np.float64, order="F")
+    for j, col in enumerate(table.columns):
+        X[:, j] = col.to_numpy()
+    return X
+
+
+def _arrow_view(table, body):
+    """Read-only (rows, columns) view over the column buffers inside `body`, or None if it cannot be one."""
+    if table.num_rows == 0 or any(col.num_chunks != 1 for col in table.columns):
+        return None
+    arrays = [col.chunk(0) for col in table.columns]
+    dtype = np.dtype(arrays[0].type.to_pandas_dtype())
+    if dtype not in FLOAT_DTYPES or any(a.type != arrays[0].type for a in arrays):
+        return None
+
+    start = np.frombuffer(body, dtype=np.uint8).ctypes.data
+    offsets = [a.buffers()[1].address + a.offset * dtype.itemsize - start for a in arrays]
+    stride = offsets[1] - offsets[0] if len(offsets) > 1 else dtype.itemsize * table.num_rows
+    span = offsets[-1] + dtype.itemsize * table.num_rows
+    if (
+        offsets[0] < 0 or span > len(body) or offsets[0] % dtype.itemsize or stride <= 0
+        or stride % dtype.itemsize or np.any(np.diff(offsets) != stride)
+    ):
+        return None
+
+    flat = np.frombuffer(body, dtype=dtype, count=(span - offsets[0]) // dtype.itemsize, offset=offsets[0])
+    return np.lib.stride_tricks.as_strided(
+        flat, shape=(table.num_rows, table.num_columns), strides=(dtype.itemsize, stride), writeable=False
+    )
+
+
+# -------------------------------
+# JSON FAST PATH + VALIDATION
+# -------------------------------
+# orjson (when installed) parses the body and numpy builds the matrix in one
+# call; all checks are vectorized over the whole batch and fail with 422.
+def json_loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _to_builtin(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize obj, writing numpy arrays directly (no Python lists with orjson)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_to_builtin).encode()
+
+
+def _invalid(detail):
+    return HTTPException(status_code=422, detail=detail)
+
+
+def features_array(rows):
+    """Parsed JSON rows -> float64 ndarray, with a precise 422 for ragged or non-numeric rows."""
+    try:
+        X = np.array(rows)
+    except ValueError:
+        X = None
+
+    if X is None or X.dtype.kind not in "iuf":
+        if isinstance(rows, list) and rows and all(isinstance(r, list) for r in rows):
+            width = len(rows[0])
+            for i, row in enumerate(rows):
+                if len(row) != width:
+                    raise _invalid(f"Row {i} has {len(row)} values; row 0 has {width}.")
+        raise _invalid("'features' must contain only numbers.")
+    return X.astype(np.float64, copy=False)
+
+
+def validate_features(X, n_features=N_FEATURES):
+    """Check a feature matrix (n_rows x n_features, all finite); returns it unchanged."""
+    if X.ndim != 2:
+        raise _invalid(f"'features' must be a list of rows (2-D); got {X.ndim}-D.")
+    if X.shape[0] == 0:
+        raise _invalid("'features' contains no rows.")
+    if X.shape[1] != n_features:
+        raise _invalid(f"Expected {n_features} features per row, got {X.shape[1]}.")
+
+    finite = np.isfinite(X).all(axis=1)
+    if not finite.all():
+        bad = np.flatnonzero(~finite)
+        raise _invalid(f"NaN or infinite values in {len(bad)} row(s), first at row {int(bad[0])}.")
+    return X
+
+
+def decode_json_features(body: bytes):
+    try:
+        payload = json_loads(body)
+    except ValueError as e:
+        raise _invalid(f"Invalid JSON body: {e}")
+    if not isinstance(payload, dict) or "features" not in payload:
+        raise _invalid("Missing 'features' key.")
+    return features_array(payload["features"])
+
+
+def decode_features(body: bytes, fmt: str):
+    if fmt == "json":
+        return decode_json_features(body)
+    if fmt == "npy":
+        return decode_npy(body)
+    return decode_arrow(body)
+
+
+# -------------------------------
+# ENCODE
+# -------------------------------
+def encode_results(preds, probs, fmt: str):
+    if fmt == "json":
+        return encode_json_results(preds, probs), JSON_TYPE
+
+    if probs is None:
+        probs = np.full(len(preds), np.nan)
+
+    if fmt == "npy":
+        out = np.empty(len(preds), dtype=RESULT_DTYPE)
+        out["prediction"] = preds
+        out["probability"] = probs
+        buf = io.BytesIO()
+        np.lib.format.write_array(buf, out, allow_pickle=False)
+        return buf.getvalue(), NPY_TYPE
+
+    pa = _import_pyarrow()
+    table = pa.table({
+        "prediction": pa.array(np.asarray(preds, dtype=np.int64)),
+        "probability": pa.array(np.asarray(probs, dtype=np.float64)),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes(), ARROW_TYPE
+
+
+def encode_json_results(preds, probs):
+    return json_dumps({
+        "predictions": np.ascontiguousarray(preds, dtype=np.int64),
+        "probabilities": (
+            np.ascontiguousarray(probs, dtype=np.float64) if probs is not None else [None] * len(preds)
+        ),
+    })
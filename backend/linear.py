@@ -0,0 +1,73 @@
+import numpy as np
+from scipy.special import expit
+
+# -------------------------------
+# FUSED LINEAR SCORER
+# -------------------------------
+# PCA / StandardScaler -> LogisticRegression is affine end to end, so the
+# whole pipeline folds into one weight vector over the raw features plus a
+# bias: one dot product per row instead of center + project + dot.
+
+
+class FusedLinearScorer:
+    def __init__(self, coef, intercept, classes, decision_threshold=None):
+        self.coef_ = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = self.coef_.shape[0]
+        if decision_threshold is not None:
+            self.decision_threshold_ = decision_threshold
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected 2D input with {self.n_features_in_} features, got shape {X.shape}"
+            )
+        return X @ self.coef_ + self.intercept_
+
+    def predict_proba(self, X):
+        # Same form as LogisticRegression._predict_proba_lr for binary problems
+        p = expit(self.decision_function(X))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def fuse_linear_pipeline(pipe):
+    """Fold a fitted [scaler/PCA ...] -> binary linear classifier pipeline into a FusedLinearScorer."""
+    steps = [est for _, est in pipe.steps] if hasattr(pipe, "steps") else [pipe]
+    *transforms, clf = steps
+
+    if getattr(clf, "coef_", None) is None or clf.coef_.shape[0] != 1:
+        raise ValueError(f"Final step must be a fitted binary linear classifier, got {type(clf).__name__}")
+
+    # Track the pipeline prefix as x -> x @ A + c
+    n_features = transforms[0].n_features_in_ if transforms else clf.n_features_in_
+    A = np.eye(n_features)
+    c = np.zeros(n_features)
+
+    for step in transforms:
+        if hasattr(step, "components_"):
+            # PCA / IncrementalPCA: (x - mean) @ components.T, optionally whitened
+            P = step.components_.T
+            if getattr(step, "whiten", False):
+                P = P / np.sqrt(step.explained_variance_)
+            mean = step.mean_ if step.mean_ is not None else 0.0
+            A, c = A @ P, (c - mean) @ P
+        elif hasattr(step, "scale_") and hasattr(step, "mean_"):
+            # StandardScaler
+            mean = step.mean_ if step.with_mean else 0.0
+            scale = step.scale_ if step.with_std else 1.0
+            A, c = A / scale, (c - mean) / scale
+        else:
+            raise ValueError(f"Cannot fold non-linear step {type(step).__name__}")
+
+    w = clf.coef_.ravel()
+    return FusedLinearScorer(
+        A @ w,
+        c @ w + clf.intercept_[0],
+        clf.classes_,
+        decision_threshold=getattr(pipe, "decision_threshold_", None),
+    )
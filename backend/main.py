@@ -1,20 +1,61 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.gzip import GZipMiddleware
+from contextlib import asynccontextmanager
+from functools import partial
 from pydantic import BaseModel
 from typing import List
+import asyncio
 import joblib
-import numpy as np
+import os
+import threading
+import time
 from pathlib import Path
 
+from backend.batching import MicroBatcher
+from backend.cache import ResultCache, build_backend
+from backend.cascade import Cascade
+from backend.executor import InferencePool
+from backend.forest import compile_forest
+from backend.metrics import (
+    Metrics, ResponseStartMarker, TimingMiddleware, counts_histogram_lines, sample_lines, stage,
+)
+from backend.registry import ModelRegistry
+from backend.formats import (
+    ARROW_TYPE, N_FEATURES, NPY_TYPE, decode_features, decode_json_features, encode_results, media_format,
+    validate_features,
+)
+from backend.scoring import Scorer
+from backend.streaming import CSV_TYPE, NDJSON_TYPE, DuplexStreamingResponse, score_stream, stream_format
+
 # -------------------------------
 # APP CONFIG
 # -------------------------------
+@asynccontextmanager
+async def lifespan(app):
+    # Warm every model in the background; /ready flips once all are loaded
+    threading.Thread(target=preload_models, name="preload-models", daemon=True).start()
+    REGISTRY.watch(MODEL_WATCH_INTERVAL)
+    yield
+
 app = FastAPI(
     title="Credit Card Fraud Detection API",
     description="API for predicting fraud using Logistic Regression & Random Forest",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Per-stage request timing (Server-Timing header) + Prometheus /metrics.
+# METRICS=0 skips both middlewares; stage() then does nothing.
+METRICS_ENABLED = os.getenv("METRICS", "1") == "1"
+METRICS = Metrics(enabled=METRICS_ENABLED)
+
+# Middleware added later wraps the earlier ones: the marker sits inside
+# GZip and the timer outside it, so compression shows up as its own stage
+if METRICS_ENABLED:
+    app.add_middleware(ResponseStartMarker)
+
 # Enable GZip compression → 5x speedup for large requests
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
@@ -28,7 +69,72 @@ MODEL_URLS = {
     "rf": "https://github.com/SRIHARSHA-BHARADWAJ/Credit-Card-Fraud-Detection-ML-WebApp/releases/download/v1.0.0/rf.pkl",
 }
 
-MODEL_CACHE = {}
+# Two-stage model served alongside the downloadable ones (see CASCADE below)
+CASCADE_MODEL = "cascade"
+
+if METRICS_ENABLED:
+    app.add_middleware(TimingMiddleware, metrics=METRICS, models=[*MODEL_URLS, CASCADE_MODEL])
+
+# LRU-evict loaded models above this many MB (0 = unlimited)
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# Poll artifacts every N seconds and hot-swap retrained ones (0 = off)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+
+# Models warmed at startup (PRELOAD_MODELS="" to load lazily)
+PRELOAD_MODELS = [m for m in os.getenv("PRELOAD_MODELS", ",".join(MODEL_URLS)).split(",") if m]
+
+# joblib mmap_mode for artifacts; pure-NumPy ones (e.g. rf.compiled.pkl) are
+# then shared read-only through the page cache by every worker
+MODEL_MMAP = os.getenv("MODEL_MMAP", "r") or None
+
+# Rows scored per internal batch by /predict-stream
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", "4000"))
+
+# Inference pool: INFERENCE_POOL=thread|process, per-model concurrency and
+# queue bound (503 when full), big batches scored INFERENCE_CHUNK_ROWS at a time
+POOL = InferencePool(
+    kind=os.getenv("INFERENCE_POOL", "thread"),
+    workers=int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1))),
+    model_concurrency=int(os.getenv("MODEL_CONCURRENCY", "0")) or None,
+    queue_limit=int(os.getenv("INFERENCE_QUEUE_LIMIT", "64")),
+    chunk_rows=int(os.getenv("INFERENCE_CHUNK_ROWS", "4000")),
+)
+
+# Prediction result cache: RESULT_CACHE=off|memory|redis|local (local = in-process Redis stand-in)
+RESULT_CACHE_KIND = os.getenv("RESULT_CACHE", "off")
+RESULT_CACHE = None
+if RESULT_CACHE_KIND != "off":
+    RESULT_CACHE = ResultCache(
+        build_backend(
+            RESULT_CACHE_KIND,
+            url=os.getenv("RESULT_CACHE_URL", "redis://localhost:6379/0"),
+            max_items=int(os.getenv("RESULT_CACHE_MAX_ITEMS", "200000")),
+        ),
+        ttl=float(os.getenv("RESULT_CACHE_TTL", "300")),
+    )
+
+# Micro-batching of concurrent /predict calls (MICROBATCH=0 to disable)
+MICROBATCH_ENABLED = os.getenv("MICROBATCH", "1") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+BATCHERS = {}
+
+# "compiled" swaps the RF for the array-backed engine in backend/forest.py
+FOREST_ENGINE = os.getenv("FOREST_ENGINE", "sklearn")
+
+# "fused" serves <name>.fused.pkl (PCA + LogisticRegression folded into one
+# weight vector by src/fuse.py) when present; "sklearn" serves the pipeline
+LINEAR_ENGINE = os.getenv("LINEAR_ENGINE", "fused")
+
+# model=cascade: logreg screens every row and only its uncertain band goes
+# to rf. The band comes from models/cascade.json (written by src/train.py);
+# CASCADE_LOW / CASCADE_HIGH override it
+CASCADE = Cascade(
+    MODEL_DIR / "cascade.json",
+    low=float(os.environ["CASCADE_LOW"]) if os.getenv("CASCADE_LOW") else None,
+    high=float(os.environ["CASCADE_HIGH"]) if os.getenv("CASCADE_HIGH") else None,
+)
 
 # -------------------------------
 # Download model if missing
@@ -45,6 +151,7 @@ def download_model(model_name: str):
     MODEL_DIR.mkdir(exist_ok=True)
 
     print(f"Downloading model: {model_name} ...")
+    t0 = time.perf_counter()
     r = requests.get(url)
     if r.status_code != 200:
         raise HTTPException(status_code=500, detail=f"Failed to download model: {url}")
@@ -52,28 +159,88 @@ def download_model(model_name: str):
     with open(dest, "wb") as f:
         f.write(r.content)
 
+    if METRICS_ENABLED:
+        METRICS.download_seconds.observe(time.perf_counter() - t0, model_name)
     print(f"Saved model: {dest}")
     return dest
 
 # -------------------------------
 # Load Model
 # -------------------------------
-def load_model(model_name: str):
-    if model_name in MODEL_CACHE:
-        return MODEL_CACHE[model_name]
-
+def resolve_model_path(model_name: str):
     model_path = MODEL_DIR / f"{model_name}.pkl"
+    compiled_path = MODEL_DIR / f"{model_name}.compiled.pkl"
+    fused_path = MODEL_DIR / f"{model_name}.fused.pkl"
 
+    if FOREST_ENGINE == "compiled" and compiled_path.exists():
+        return compiled_path
+    if LINEAR_ENGINE == "fused" and fused_path.exists():
+        return fused_path
     if not model_path.exists():
-        model_path = download_model(model_name)
+        return download_model(model_name)
+    return model_path
 
+def build_scorer(model_name: str, model_path):
     try:
-        model = joblib.load(model_path)
+        model = joblib.load(model_path, mmap_mode=MODEL_MMAP)
     except:
         raise HTTPException(status_code=500, detail="Model corrupted or unreadable.")
 
-    MODEL_CACHE[model_name] = model
-    return model
+    # THRESHOLD_RF=0.4 etc. overrides the threshold stored with the model
+    threshold = os.getenv(f"THRESHOLD_{model_name.upper()}", getattr(model, "decision_threshold_", None))
+
+    if FOREST_ENGINE == "compiled":
+        model = compile_forest(model)
+
+    return Scorer(model, threshold)
+
+REGISTRY = ModelRegistry(
+    resolve_model_path, build_scorer, memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1e6)
+)
+
+def load_model(model_name: str):
+    return REGISTRY.get(model_name)
+
+async def get_scorer(model_name: str):
+    if model_name == CASCADE_MODEL:
+        # Both members are loaded; requests are validated against the screening model
+        config = CASCADE.config()
+        await get_scorer(config["escalate"])
+        return await get_scorer(config["screen"])
+
+    # Cache hits stay on the event loop; a cold load runs in the threadpool
+    scorer = REGISTRY.peek(model_name)
+    if scorer is not None:
+        return scorer
+    return await run_in_threadpool(load_model, model_name)
+
+def preload_models():
+    for name in PRELOAD_MODELS:
+        try:
+            load_model(name)
+        except Exception:
+            pass  # recorded in REGISTRY.status
+
+async def score_rows(model_name: str, X):
+    if model_name == CASCADE_MODEL:
+        preds, probs, _ = await CASCADE.score(X, score_rows)
+        return preds, probs
+
+    # Resolved like the endpoints do: an evicted model reloads in the threadpool, not on the loop
+    scorer = await get_scorer(model_name)
+    if RESULT_CACHE is None:
+        return await POOL.run(model_name, scorer, X)
+    return await RESULT_CACHE.score(model_name, scorer, X, partial(POOL.run, model_name, scorer))
+
+def get_batcher(model_name: str):
+    batcher = BATCHERS.get(model_name)
+    if batcher is None:
+        batcher = MicroBatcher(
+            partial(score_rows, model_name), MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS,
+            max_in_flight=POOL.model_concurrency, max_queued=POOL.queue_limit,
+        )
+        BATCHERS[model_name] = batcher
+    return batcher
 
 # -------------------------------
 # INPUT SCHEMAS
@@ -91,28 +258,74 @@ class BatchFeatures(BaseModel):
 def home():
     return {"message": "Fraud Detection API running!"}
 
+# -------------------------------
+# READINESS
+# -------------------------------
+@app.get("/ready")
+def ready():
+    status = {name: REGISTRY.status.get(name, "pending") for name in PRELOAD_MODELS}
+    # An evicted model loaded fine before and reloads on its next request
+    body = {"ready": all(s in ("ready", "evicted") for s in status.values()), "models": status}
+    if not body["ready"]:
+        raise HTTPException(status_code=503, detail=body)
+    return body
+
 # -------------------------------
 # LIST MODELS
 # -------------------------------
 @app.get("/get-models")
 def get_models():
-    return {"available_models": list(MODEL_URLS.keys())}
+    try:
+        CASCADE.config()
+        cascade = [CASCADE_MODEL]
+    except HTTPException:
+        cascade = []
+    return {
+        "available_models": list(MODEL_URLS.keys()) + cascade,
+        "loaded": REGISTRY.loaded(),
+        "status": dict(REGISTRY.status)
+    }
 
 # -------------------------------
-# SINGLE PREDICT
+# HOT RELOAD
 # -------------------------------
-@app.post("/predict")
-def predict(input_data: FeatureInput, model: str = "logreg"):
+# Loads the current artifact in the background and swaps it in atomically
+# if its content hash changed; requests keep being served meanwhile.
+@app.post("/reload-model")
+def reload_model(model: str):
+    if model not in MODEL_URLS:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {model}")
+    REGISTRY.reload_async(model)
+    return {"reloading": model}
 
-    model_obj = load_model(model)
-    x = np.array(input_data.features).reshape(1, -1)
+# -------------------------------
+# SINGLE PREDICT
+# -------------------------------
+# Body parsed with the fast JSON path instead of Pydantic's per-element
+# List[float] validation; the schema is still published for the docs
+PREDICT_BODY_DOC = {
+    "requestBody": {"content": {"application/json": {"schema": FeatureInput.model_json_schema()}}}
+}
 
-    pred = int(model_obj.predict(x)[0])
-
-    try:
-        prob = float(model_obj.predict_proba(x)[0][1])
-    except:
-        prob = None
+@app.post("/predict", openapi_extra=PREDICT_BODY_DOC)
+async def predict(request: Request, model: str = "logreg"):
+
+    with stage("load"):
+        scorer = await get_scorer(model)
+    with stage("parse"):
+        x = decode_json_features(await request.body())
+        validate_features(x.reshape(1, -1), scorer.n_features or N_FEATURES)
+
+    with stage("score"):
+        if MICROBATCH_ENABLED:
+            try:
+                pred, prob = await get_batcher(model).submit(x)
+            except asyncio.QueueFull:
+                # Rows waiting in the batcher count against the pool's queue limit
+                raise POOL.reject(model)
+        else:
+            preds, probs = await score_rows(model, x.reshape(1, -1))
+            pred, prob = int(preds[0]), float(probs[0]) if probs is not None else None
 
     return {
         "model_used": model,
@@ -121,34 +334,143 @@ def predict(input_data: FeatureInput, model: str = "logreg"):
     }
 
 # -------------------------------
-# BATCH PREDICT (FAST)
+# MICRO-BATCHING / POOL STATS
 # -------------------------------
-@app.post("/predict-batch")
-def predict_batch(input_data: dict, model: str = "rf"):
-    try:
-        # 1. Load model
-        model_obj = load_model(model)
+@app.get("/batching-stats")
+def batching_stats():
+    return {
+        "enabled": MICROBATCH_ENABLED,
+        "models": {name: b.stats() for name, b in BATCHERS.items()}
+    }
 
-        # 2. Extract features list
-        rows = input_data.get("features")
-        if rows is None:
-            raise HTTPException(status_code=400, detail="Missing 'features' key.")
+@app.get("/pool-stats")
+def pool_stats():
+    return POOL.stats()
 
-        X = np.array(rows)
+@app.get("/cascade-stats")
+def cascade_stats():
+    return CASCADE.stats()
 
-        # 3. Predictions
-        preds = model_obj.predict(X).tolist()
+@app.get("/cache-stats")
+def cache_stats():
+    if RESULT_CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **RESULT_CACHE.stats()}
 
-        # 4. Probabilities
-        try:
-            probs = model_obj.predict_proba(X)[:, 1].tolist()
-        except:
-            probs = [None] * len(preds)
+# -------------------------------
+# PROMETHEUS METRICS
+# -------------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Histograms are recorded per request; the rest is read from the
+    # registry, micro-batchers and result cache at scrape time
+    loaded = REGISTRY.loaded()
+    lines = sample_lines(
+        "fraud_api_model_load_duration_seconds", "Time to resolve and load the current model artifact.",
+        "gauge", [((name, info["version"]), info["load_seconds"]) for name, info in loaded.items()],
+        ("model", "version"),
+    )
+    lines += sample_lines(
+        "fraud_api_model_size_bytes", "Artifact size of loaded models.",
+        "gauge", [((name, info["version"]), info["size_bytes"]) for name, info in loaded.items()],
+        ("model", "version"),
+    )
+
+    lines += ["# HELP fraud_api_microbatch_size Rows per micro-batch flush.",
+              "# TYPE fraud_api_microbatch_size histogram"]
+    for name, batcher in BATCHERS.items():
+        lines += counts_histogram_lines("fraud_api_microbatch_size", batcher.size_counts, ("model",), (name,))
+
+    if RESULT_CACHE is not None:
+        cache = RESULT_CACHE.stats()["models"]
+        for key, kind in (("hits", "counter"), ("misses", "counter"), ("hit_rate", "gauge")):
+            suffix = "_total" if kind == "counter" else ""
+            lines += sample_lines(
+                f"fraud_api_result_cache_{key}{suffix}", f"Result cache {key.replace('_', ' ')} per model.",
+                kind, [((name,), c[key]) for name, c in cache.items()], ("model",),
+            )
+
+    lines += sample_lines("fraud_api_cascade_rows_total", "Rows scored by the cascade.",
+                          "counter", [((), CASCADE.rows)])
+    lines += sample_lines("fraud_api_cascade_escalated_total", "Cascade rows escalated to the second model.",
+                          "counter", [((), CASCADE.escalated)])
+
+    pool = POOL.stats()
+    lines += sample_lines("fraud_api_pool_rejected_total", "Requests rejected with 503 by the inference pool.",
+                          "counter", [((name,), n) for name, n in pool["rejected"].items()], ("model",))
+    lines += sample_lines("fraud_api_pool_in_flight", "Requests queued or running in the inference pool.",
+                          "gauge", [((name,), n) for name, n in pool["in_flight"].items()], ("model",))
+
+    return PlainTextResponse(METRICS.render(lines), media_type="text/plain; version=0.0.4")
 
-        return {
-            "predictions": preds,
-            "probabilities": probs
+# -------------------------------
+# BATCH PREDICT (FAST)
+# -------------------------------
+# JSON {"features": [[...], ...]} by default; raw .npy (application/x-npy)
+# or Arrow IPC (application/vnd.apache.arrow.stream) bodies are decoded
+# without going through Python lists and answered in the same format
+# (or the one named in Accept).
+BATCH_BODY_DOC = {
+    "requestBody": {
+        "content": {
+            "application/json": {"schema": BatchFeatures.model_json_schema()},
+            NPY_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            ARROW_TYPE: {"schema": {"type": "string", "format": "binary"}},
         }
+    }
+}
+
+@app.post("/predict-batch", openapi_extra=BATCH_BODY_DOC)
+async def predict_batch(request: Request, model: str = "rf"):
+    in_fmt = media_format(request.headers.get("content-type"))
+    out_fmt = media_format(request.headers.get("accept"))
+    if out_fmt == "json":
+        out_fmt = in_fmt
+
+    # 1. Load model
+    with stage("load"):
+        scorer = await get_scorer(model)
 
+    # 2. Decode + validate: malformed bodies surface as 400/415/422
+    with stage("parse"):
+        X = decode_features(await request.body(), in_fmt)
+        validate_features(X, scorer.n_features or N_FEATURES)
+
+    METRICS.observe_batch("/predict-batch", model, len(X))
+
+    # 3. Predictions + probabilities (single model pass)
+    try:
+        with stage("score"):
+            if model == CASCADE_MODEL:
+                preds, probs, n_escalated = await CASCADE.score(X, score_rows)
+            else:
+                preds, probs = await score_rows(model, X)
+    except HTTPException:
+        raise
     except Exception as e:
-        return {"detail": f"Batch prediction failed: {str(e)}"}
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {e}")
+
+    # 4. Encode arrays straight to the response format
+    with stage("serialize"):
+        content, media_type = encode_results(preds, probs, out_fmt)
+    # Share of this batch the cascade sent to the second model
+    headers = {"x-cascade-escalated": f"{n_escalated / max(len(X), 1):.6f}"} if model == CASCADE_MODEL else None
+    return Response(content=content, media_type=media_type, headers=headers)
+
+# -------------------------------
+# STREAMING PREDICT
+# -------------------------------
+# Chunked CSV (text/csv) or NDJSON (application/x-ndjson) rows in, one
+# result line per row out, scored STREAM_BATCH_ROWS at a time. Output is
+# NDJSON unless Accept asks for text/csv.
+@app.post("/predict-stream")
+async def predict_stream(request: Request, model: str = "rf"):
+    await get_scorer(model)
+
+    in_fmt = stream_format(request.headers.get("content-type"))
+    out_fmt = stream_format(request.headers.get("accept"), default=in_fmt)
+
+    return DuplexStreamingResponse(
+        score_stream(request.stream(), partial(score_rows, model), in_fmt, out_fmt, STREAM_BATCH_ROWS),
+        media_type=CSV_TYPE if out_fmt == "csv" else NDJSON_TYPE,
+    )
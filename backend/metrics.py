@@ -0,0 +1,226 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+# -------------------------------
+# REQUEST STAGE TIMING + PROMETHEUS METRICS
+# -------------------------------
+# TimingMiddleware opens a per-request timings dict; handlers wrap their
+# steps in `with stage("parse"):` and the totals come back as a
+# Server-Timing header and as Prometheus histograms on /metrics. With
+# metrics disabled the middleware is not installed and stage() returns a
+# shared no-op, so the cost is one ContextVar lookup per stage.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_BUCKETS = (1, 8, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+_timings = ContextVar("request_timings", default=None)
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "t0")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timings[self.name] = self.timings.get(self.name, 0.0) + time.perf_counter() - self.t0
+
+
+class _NoStage:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """Time a block as a named stage of the current request (no-op outside TimingMiddleware)."""
+    timings = _timings.get()
+    if timings is None:
+        return _NO_STAGE
+    return _Stage(timings, name)
+
+
+# -------------------------------
+# METRIC TYPES
+# -------------------------------
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: ([*v[0]], v[1]) for k, v in self._series.items()}
+        for labels, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                names = (*self.label_names, "le")
+                lines.append(f"{self.name}_bucket{_labels(names, (*labels, bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+def sample_lines(name, help, kind, samples, label_names=()):
+    """Exposition lines for values read at scrape time: samples = [(label values, value)]."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_labels(label_names, labels)} {value}" for labels, value in samples]
+    return lines
+
+
+def counts_histogram_lines(name, counts, label_names, labels, buckets=BATCH_BUCKETS):
+    """Histogram series (no HELP/TYPE) from a {value: occurrences} counter, e.g. micro-batch sizes."""
+    per_bucket = [0] * (len(buckets) + 1)
+    for value, n in counts.items():
+        per_bucket[bisect.bisect_left(buckets, value)] += n
+    lines = []
+    cumulative = 0
+    for bound, count in zip((*buckets, "+Inf"), per_bucket):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels((*label_names, 'le'), (*labels, bound))} {cumulative}")
+    lines.append(f"{name}_sum{_labels(label_names, labels)} {sum(v * n for v, n in counts.items())}")
+    lines.append(f"{name}_count{_labels(label_names, labels)} {cumulative}")
+    return lines
+
+
+# -------------------------------
+# METRICS REGISTRY
+# -------------------------------
+class Metrics:
+    def __init__(self, enabled=True, namespace="fraud_api"):
+        self.enabled = enabled
+        self.request_seconds = Histogram(
+            f"{namespace}_request_duration_seconds", "Request latency.", ("endpoint", "model", "status")
+        )
+        self.stage_seconds = Histogram(
+            f"{namespace}_stage_duration_seconds", "Time per request stage.", ("endpoint", "stage")
+        )
+        self.batch_rows = Histogram(
+            f"{namespace}_batch_rows", "Rows per batch request.", ("endpoint", "model"), BATCH_BUCKETS
+        )
+        self.download_seconds = Histogram(
+            f"{namespace}_model_download_duration_seconds", "Model artifact download time.", ("model",)
+        )
+
+    def observe_batch(self, endpoint, model, rows):
+        if self.enabled:
+            self.batch_rows.observe(rows, endpoint, model)
+
+    def render(self, extra_lines=()):
+        lines = []
+        for metric in (self.request_seconds, self.stage_seconds, self.batch_rows, self.download_seconds):
+            lines += metric.render()
+        lines += extra_lines
+        return "\n".join(lines) + "\n"
+
+
+# -------------------------------
+# MIDDLEWARE
+# -------------------------------
+class TimingMiddleware:
+    """Outermost ASGI middleware: opens the request's timings and reports them."""
+
+    def __init__(self, app, metrics, models=()):
+        self.app = app
+        self.metrics = metrics
+        self.models = set(models)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = {}
+        token = _timings.set(timings)
+        t0 = time.perf_counter()
+        status = [500]
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                total = time.perf_counter() - t0
+                # Time between the app's response and here is spent compressing
+                app_end = timings.pop("_app_end", None)
+                if app_end is not None and message.get("headers") and _has_encoding(message["headers"]):
+                    timings["gzip"] = time.perf_counter() - app_end
+                timings["total"] = total
+                header = ", ".join(f"{k};dur={v * 1000:.3f}" for k, v in timings.items())
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _timings.reset(token)
+            self._record(scope, timings, status[0], time.perf_counter() - t0)
+
+    def _record(self, scope, timings, status, elapsed):
+        route = scope.get("route")
+        endpoint = getattr(route, "path", None) or "unmatched"
+        model = _query_param(scope, "model")
+        model = model if model in self.models else ("" if model is None else "other")
+        self.metrics.request_seconds.observe(elapsed, endpoint, model, str(status))
+        for name, seconds in timings.items():
+            if name != "total":
+                self.metrics.stage_seconds.observe(seconds, endpoint, name)
+
+
+class ResponseStartMarker:
+    """Innermost ASGI middleware: notes when the app itself started its response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        timings = _timings.get()
+        if timings is None or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_marked(message):
+            if message["type"] == "http.response.start":
+                timings["_app_end"] = time.perf_counter()
+            await send(message)
+
+        await self.app(scope, receive, send_marked)
+
+
+def _has_encoding(headers):
+    return any(k.lower() == b"content-encoding" for k, _ in headers)
+
+
+def _query_param(scope, name):
+    prefix = f"{name}=".encode()
+    for part in scope.get("query_string", b"").split(b"&"):
+        if part.startswith(prefix):
+            return part[len(prefix):].decode("latin-1")
+    return None
@@ -1,18 +1,26 @@
 import joblib
 import numpy as np
 
+from backend.scoring import Scorer
+
 class ModelLoader:
-    def __init__(self, model_path="models/logreg.pkl"):
+    def __init__(self, model_path="models/logreg.pkl", threshold=None):
         self.model = joblib.load(model_path)
+        self.scorer = Scorer(self.model, threshold)
 
     def predict(self, features: list):
         arr = np.array(features).reshape(1, -1)
-        pred = self.model.predict(arr)[0]
-        try:
-            prob = self.model.predict_proba(arr)[0][1]
-        except:
-            prob = 0.0
+        preds, probs = self.scorer.score(arr)
+        return {
+            "prediction": int(preds[0]),
+            "fraud_probability": float(probs[0]) if probs is not None else 0.0
+        }
+
+    def predict_batch(self, features):
+        # One vectorized pass over all rows; same shape as the /predict-batch response
+        X = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        preds, probs = self.scorer.score(X)
         return {
-            "prediction": int(pred),
-            "fraud_probability": float(prob)
+            "predictions": preds.tolist(),
+            "probabilities": probs.tolist() if probs is not None else [None] * len(preds)
         }
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# -------------------------------
+# MODEL REGISTRY
+# -------------------------------
+# Tracks every loaded model with the content hash of its artifact, swaps in
+# retrained artifacts atomically (in-flight requests keep the scorer they
+# started with) and evicts least-recently-used models over a memory budget.
+
+
+def file_digest(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+class ModelEntry:
+    def __init__(self, name, scorer, path, sha256, load_seconds):
+        stat = os.stat(path)
+        self.name = name
+        self.scorer = scorer
+        self.path = path
+        self.sha256 = sha256
+        self.version = sha256[:12]
+        # Artifact size stands in for memory: pickled arrays load at about
+        # the same size, and mapped artifacts cost at most that much
+        self.size_bytes = stat.st_size
+        self.mtime = stat.st_mtime
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.last_used = None
+
+        scorer.version = self.version
+
+    def info(self):
+        return {
+            "version": self.version,
+            "sha256": self.sha256,
+            "path": str(self.path),
+            "size_bytes": self.size_bytes,
+            "loaded_at": _iso(self.loaded_at),
+            "load_seconds": round(self.load_seconds, 4),
+            "last_used": _iso(self.last_used),
+        }
+
+
+class ModelRegistry:
+    def __init__(self, resolve, build, memory_budget_bytes=0):
+        # resolve(name) -> artifact path (downloading if needed);
+        # build(name, path) -> Scorer. Both raise on failure.
+        self.resolve = resolve
+        self.build = build
+        self.memory_budget_bytes = memory_budget_bytes
+
+        self.status = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._watcher = None
+
+    # ---------- lookup ----------
+    def peek(self, name):
+        """Loaded scorer for name (marked as used), or None without loading."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            entry.last_used = time.time()
+            self._entries.move_to_end(name)
+            return entry.scorer
+
+    def get(self, name, version=None):
+        """Scorer for name, loading it if needed (or if it is not at `version`)."""
+        scorer = self.peek(name)
+        if scorer is not None and (version is None or scorer.version == version):
+            return scorer
+        return self._load(name, force=scorer is not None)
+
+    def loaded(self):
+        with self._lock:
+            return {name: entry.info() for name, entry in self._entries.items()}
+
+    # ---------- load / swap ----------
+    def _load_lock(self, name):
+        with self._lock:
+            return self._load_locks.setdefault(name, threading.Lock())
+
+    def _load(self, name, force=False):
+        # One loader per model; concurrent callers wait for it instead of loading twice
+        with self._load_lock(name):
+            with self._lock:
+                current = self._entries.get(name)
+            if current is not None and not force:
+                return self.peek(name)
+
+            if current is None and self.status.get(name) != "evicted":
+                # A reload after eviction stays "evicted" (still ready) until it lands
+                self.status[name] = "loading"
+            t0 = time.perf_counter()
+            try:
+                path = self.resolve(name)
+                digest = file_digest(path)
+                if current is not None and current.path == path and current.sha256 == digest:
+                    current.mtime = os.stat(path).st_mtime
+                    return self.peek(name)
+                scorer = self.build(name, path)
+            except Exception as e:
+                if current is None:
+                    self.status[name] = f"failed: {getattr(e, 'detail', e)}"
+                raise
+
+            entry = ModelEntry(name, scorer, path, digest, time.perf_counter() - t0)
+            entry.last_used = time.time()
+            with self._lock:
+                # Atomic swap: requests already holding the old scorer finish on it
+                self._entries[name] = entry
+                self._entries.move_to_end(name)
+                self._evict(keep=name)
+            self.status[name] = "ready"
+            print(f"Loaded model: {name} (version {entry.version}, {entry.size_bytes / 1e6:.1f} MB)")
+            return scorer
+
+    def reload(self, name):
+        """Load the current artifact for name and swap it in if its content changed."""
+        return self._load(name, force=True)
+
+    def reload_async(self, name):
+        threading.Thread(target=self._reload_quietly, args=(name,), name=f"reload-{name}", daemon=True).start()
+
+    def _reload_quietly(self, name):
+        try:
+            self.reload(name)
+        except Exception as e:
+            print(f"Reload of {name} failed, keeping current version: {getattr(e, 'detail', e)}")
+
+    def _evict(self, keep):
+        if not self.memory_budget_bytes:
+            return
+        total = sum(e.size_bytes for e in self._entries.values())
+        for name in list(self._entries):
+            if total <= self.memory_budget_bytes:
+                break
+            if name == keep:
+                continue
+            total -= self._entries.pop(name).size_bytes
+            self.status[name] = "evicted"
+            print(f"Evicted model: {name} (memory budget {self.memory_budget_bytes / 1e6:.0f} MB)")
+
+    # ---------- artifact watcher ----------
+    def watch(self, interval):
+        """Poll loaded artifacts every `interval` seconds and hot-swap changed ones."""
+        if self._watcher is not None or interval <= 0:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                with self._lock:
+                    entries = list(self._entries.values())
+                for entry in entries:
+                    try:
+                        changed = os.stat(entry.path).st_mtime != entry.mtime
+                    except OSError:
+                        continue
+                    if changed:
+                        self._reload_quietly(entry.name)
+
+        self._watcher = threading.Thread(target=loop, name="model-watcher", daemon=True)
+        self._watcher.start()
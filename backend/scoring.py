@@ -0,0 +1,39 @@
+import numpy as np
+
+# -------------------------------
+# SHARED SCORING LAYER
+# -------------------------------
+# One predict_proba pass per request; labels are derived from the fraud
+# probability with a per-model decision threshold instead of a second
+# model.predict call.
+
+DEFAULT_THRESHOLD = 0.5
+
+
+class Scorer:
+    def __init__(self, model, threshold=None):
+        self.model = model
+
+        # Capability check once at load time instead of try/except per call
+        self.has_proba = callable(getattr(model, "predict_proba", None))
+
+        # Threshold saved with the model by src/train.py, unless overridden
+        if threshold is None:
+            threshold = getattr(model, "decision_threshold_", DEFAULT_THRESHOLD)
+        self.threshold = float(threshold)
+
+        # Expected row width, for request validation (None if the model does not say)
+        self.n_features = getattr(model, "n_features_in_", None)
+
+        # Artifact version, set by the model registry when served
+        self.version = None
+
+    def score(self, X):
+        """Return (labels, fraud probabilities); probabilities are None if the model has no predict_proba."""
+        if not self.has_proba:
+            return np.asarray(self.model.predict(X)).astype(np.int64), None
+
+        probs = self.model.predict_proba(X)[:, 1]
+        # Strictly greater, so 0.5 reproduces the argmax tie-break of model.predict
+        labels = (probs > self.threshold).astype(np.int64)
+        return labels, probs
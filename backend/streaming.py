@@ -0,0 +1,149 @@
+import io
+import json
+
+import numpy as np
+from fastapi.responses import StreamingResponse
+
+from backend.formats import json_dumps, json_loads
+
+# -------------------------------
+# STREAMING SCORING
+# -------------------------------
+# /predict-stream reads a chunked CSV or NDJSON body line by line, scores it
+# in fixed-size batches and yields each batch's results as soon as they are
+# ready, so memory is bounded by the batch size, not the file size.
+
+CSV_TYPE = "text/csv"
+NDJSON_TYPE = "application/x-ndjson"
+
+
+def stream_format(content_type, default="ndjson"):
+    """Map a Content-Type / Accept header to 'csv' or 'ndjson'."""
+    content_type = (content_type or "").lower()
+    if CSV_TYPE in content_type:
+        return "csv"
+    if NDJSON_TYPE in content_type:
+        return "ndjson"
+    return default
+
+
+async def iter_lines(chunks):
+    tail = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line
+    if tail:
+        yield tail
+
+
+# -------------------------------
+# PARSE
+# -------------------------------
+def parse_csv_rows(lines):
+    widths = {line.count(b",") for line in lines}
+    if len(widths) != 1:
+        raise ValueError("CSV rows have different numbers of columns.")
+    values = b",".join(lines).split(b",")
+    return np.array(values, dtype=np.float64).reshape(len(lines), -1)
+
+
+def parse_ndjson_rows(lines):
+    rows = []
+    for line in lines:
+        row = json_loads(line)
+        if isinstance(row, dict):
+            row = row.get("features")
+        rows.append(row)
+    return np.array(rows, dtype=np.float64)
+
+
+def is_csv_header(line):
+    try:
+        [float(v) for v in line.split(b",")]
+    except ValueError:
+        return True
+    return False
+
+
+# -------------------------------
+# ENCODE
+# -------------------------------
+def encode_csv_results(preds, probs):
+    buf = io.StringIO()
+    if probs is None:
+        np.savetxt(buf, preds, fmt="%d")
+    else:
+        np.savetxt(buf, np.column_stack([preds, probs]), fmt=["%d", "%.17g"], delimiter=",")
+    return buf.getvalue().encode()
+
+
+def encode_ndjson_results(preds, probs):
+    if probs is None:
+        probs = [None] * len(preds)
+    else:
+        probs = probs.tolist()
+    lines = [
+        json_dumps({"prediction": p, "fraud_probability": q})
+        for p, q in zip(preds.tolist(), probs)
+    ]
+    return b"\n".join(lines) + b"\n"
+
+
+def encode_error(message, fmt):
+    if fmt == "csv":
+        return f"error,{json.dumps(message)}\n".encode()
+    return (json.dumps({"error": message}) + "\n").encode()
+
+
+# -------------------------------
+# STREAM
+# -------------------------------
+class DuplexStreamingResponse(StreamingResponse):
+    # StreamingResponse normally polls receive() for http.disconnect while it
+    # sends, which swallows the request body chunks score_stream is still
+    # reading. A disconnect here surfaces through request.stream() instead.
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def score_stream(chunks, score, in_fmt, out_fmt, batch_rows):
+    parse = parse_csv_rows if in_fmt == "csv" else parse_ndjson_rows
+    encode = encode_csv_results if out_fmt == "csv" else encode_ndjson_results
+
+    if out_fmt == "csv":
+        yield b"prediction,fraud_probability\n"
+
+    first = True
+    batch = []
+    done = 0
+
+    async def flush(rows):
+        X = parse(rows)
+        preds, probs = await score(X)
+        return encode(preds, probs)
+
+    try:
+        async for line in iter_lines(chunks):
+            line = line.strip()
+            if not line:
+                continue
+            if first:
+                first = False
+                if in_fmt == "csv" and is_csv_header(line):
+                    continue
+
+            batch.append(line)
+            if len(batch) >= batch_rows:
+                yield await flush(batch)
+                done += len(batch)
+                batch = []
+
+        if batch:
+            yield await flush(batch)
+    except Exception as e:
+        # Headers are already sent, so failures are reported in-band
+        yield encode_error(f"Stream scoring failed after {done} rows: {e}", out_fmt)
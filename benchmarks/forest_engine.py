@@ -0,0 +1,68 @@
+import argparse
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from backend.forest import CompiledForest
+
+# ------------------------
+# Compiled forest vs sklearn predict_proba
+# ------------------------
+# python -m benchmarks.forest_engine --model models/rf.pkl
+# Without --model a 150-tree forest is fitted on synthetic 30-feature data.
+
+
+def synthetic_forest(n_rows=20000, seed=42):
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 30))
+    y = (X[:, :5].sum(axis=1) + rng.normal(scale=2.0, size=n_rows) > 4).astype(int)
+    model = RandomForestClassifier(
+        n_estimators=150, random_state=42, class_weight="balanced", n_jobs=-1
+    )
+    model.fit(X, y)
+    return model
+
+
+def time_call(fn, X, repeats):
+    fn(X)  # warm-up
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)) * 1000
+
+
+def main(args):
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    model = joblib.load(args.model) if args.model else synthetic_forest()
+    t0 = time.perf_counter()
+    compiled = CompiledForest(model, fallback_rows=args.fallback_rows)
+    print(f"Compiled {compiled.n_estimators} trees in {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"({compiled.nbytes / 1e6:.1f} MB of node arrays)")
+
+    rng = np.random.default_rng(0)
+    X_all = rng.normal(size=(max(args.batch_sizes), compiled.n_features_in_))
+
+    print(f"\n{'batch':>6} {'sklearn ms':>11} {'compiled ms':>12} {'speedup':>8}  exact")
+    for n in args.batch_sizes:
+        X = X_all[:n]
+        exact = np.array_equal(model.predict_proba(X), compiled.predict_proba(X))
+        sk = time_call(model.predict_proba, X, args.repeats)
+        cf = time_call(compiled.predict_proba, X, args.repeats)
+        print(f"{n:>6} {sk:>11.2f} {cf:>12.2f} {sk / cf:>7.1f}x  {exact}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 64, 4000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--fallback_rows", type=int, default=1024)
+    args = parser.parse_args()
+    main(args)
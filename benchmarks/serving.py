@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import io
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import feature_rows
+
+# ------------------------
+# In-process API latency / throughput
+# ------------------------
+# python -m benchmarks.serving --model_dir models
+# Drives backend.main.app through httpx's ASGI transport (no sockets), so
+# the numbers cover routing, parsing, scoring, serialization and GZip.
+NPY_TYPE = "application/x-npy"
+
+
+def summarize(name, latencies, rows, elapsed, response_bytes):
+    ms = np.asarray(latencies) * 1000
+    print(f"{name}: p50 {np.percentile(ms, 50):.2f} ms, p99 {np.percentile(ms, 99):.2f} ms, "
+          f"{rows / elapsed:.0f} rows/s")
+    return {
+        "name": name,
+        "requests": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rows_per_s": rows / elapsed,
+        "response_bytes": response_bytes,
+    }
+
+
+async def drive(client, make_request, n_requests, concurrency):
+    latencies = []
+    sizes = []
+
+    async def worker(count):
+        for _ in range(count):
+            t0 = time.perf_counter()
+            response = await make_request()
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.status_code}: {response.text[:200]}")
+            sizes.append(int(response.headers.get("content-length", len(response.content))))
+
+    await make_request()  # warm-up: model load, batcher start
+    share, extra = divmod(n_requests, concurrency)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(share + (i < extra)) for i in range(concurrency)))
+    return latencies, time.perf_counter() - t0, int(np.median(sizes))
+
+
+def npy_body(X):
+    buf = io.BytesIO()
+    np.save(buf, X.astype(np.float32))
+    return buf.getvalue()
+
+
+async def run_serving(model_dir, models=("logreg", "rf"), batch_sizes=(1, 64, 4000), n_requests=100,
+                      concurrency=1, formats=("json",), max_rows=200_000):
+    import httpx
+
+    import backend.main as api
+
+    api.MODEL_DIR = Path(model_dir)
+    results = []
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for model in models:
+            for gzip in (False, True):
+                headers = {"accept-encoding": "gzip" if gzip else "identity"}
+
+                # /predict: one row per request
+                row = feature_rows(1)[0].tolist()
+                request = lambda: client.post(f"/predict?model={model}", json={"features": row}, headers=headers)
+                lat, elapsed, size = await drive(client, request, n_requests, concurrency)
+                results.append(summarize(f"predict|model={model}|rows=1|gzip={gzip}", lat, len(lat), elapsed, size))
+
+                # /predict-batch: batch size x body format
+                for n in batch_sizes:
+                    X = feature_rows(n)
+                    count = max(5, min(n_requests, max_rows // n))
+                    for fmt in formats:
+                        if fmt == "npy":
+                            body, ctype = npy_body(X), NPY_TYPE
+                        else:
+                            body, ctype = json.dumps({"features": X.tolist()}).encode(), "application/json"
+                        request = lambda body=body, ctype=ctype: client.post(
+                            f"/predict-batch?model={model}", content=body,
+                            headers={**headers, "content-type": ctype},
+                        )
+                        lat, elapsed, size = await drive(client, request, count, concurrency)
+                        results.append(summarize(
+                            f"predict-batch|model={model}|rows={n}|gzip={gzip}|fmt={fmt}",
+                            lat, n * len(lat), elapsed, size,
+                        ))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_dir", default="models")
+    parser.add_argument("--models", nargs="+", default=["logreg", "rf"])
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 64, 4000])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--formats", nargs="+", default=["json"], choices=["json", "npy"])
+    args = parser.parse_args()
+    results = asyncio.run(run_serving(
+        args.model_dir, args.models, args.batch_sizes, args.requests, args.concurrency, args.formats
+    ))
+    print(json.dumps(results, indent=2))
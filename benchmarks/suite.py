@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+# ------------------------
+# Benchmark suite
+# ------------------------
+# python -m benchmarks.suite run --out bench.json
+# python -m benchmarks.suite compare baseline.json bench.json --tolerance 0.10
+#
+# `run` trains on synthetic data (timing the src/train.py stages), then
+# benchmarks the API in-process against the models it just trained.
+# `compare` flags every result that got slower / lower-throughput than the
+# baseline by more than the tolerance and exits 1 if there are any.
+
+# Metric -> True if higher is better
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rows_per_s": True, "seconds": False}
+
+
+def environment():
+    import numpy
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "sklearn": sklearn.__version__,
+        "cpus": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+
+def run(args):
+    from benchmarks.serving import run_serving
+    from benchmarks.training import run_training
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        results, model_dir = run_training(tmp, args.train_rows, ["--parallel", "1"])
+        if args.model_dir:
+            model_dir = args.model_dir
+        results += asyncio.run(run_serving(
+            model_dir, args.models, args.batch_sizes, args.requests, args.concurrency, args.formats
+        ))
+
+    report = {"environment": environment(), "config": vars(args), "results": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\nWrote {len(results)} results to {args.out}")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        base = {r["name"]: r for r in json.load(f)["results"]}
+    with open(args.current) as f:
+        current = {r["name"]: r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'result':<60} {'metric':<11} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name in sorted(base.keys() & current.keys()):
+        for metric, higher_is_better in METRICS.items():
+            if metric not in base[name] or metric not in current[name]:
+                continue
+            old, new = base[name][metric], current[name][metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = ""
+            # Tiny timings are mostly noise: require an absolute slowdown too
+            if worse > args.tolerance and (higher_is_better or new - old > args.min_delta):
+                flag = "  REGRESSION"
+                regressions += 1
+            if flag or args.verbose:
+                print(f"{name:<60} {metric:<11} {old:>11.3f} {new:>11.3f} {change:>+7.1%}{flag}")
+
+    missing = sorted(base.keys() - current.keys())
+    for name in missing:
+        print(f"{name:<60} missing from {args.current}")
+    print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run")
+    p.add_argument("--out", default="bench.json")
+    p.add_argument("--train_rows", type=int, default=20000)
+    p.add_argument("--model_dir", default=None, help="Serve these models instead of the freshly trained ones")
+    p.add_argument("--models", nargs="+", default=["logreg", "rf"])
+    p.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 64, 4000])
+    p.add_argument("--requests", type=int, default=100)
+    p.add_argument("--concurrency", type=int, default=1)
+    p.add_argument("--formats", nargs="+", default=["json"], choices=["json", "npy"])
+
+    p = sub.add_parser("compare")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--tolerance", type=float, default=0.10)
+    p.add_argument("--min_delta", type=float, default=0.5,
+                   help="Smallest absolute increase (ms or s) that counts as a latency regression")
+    p.add_argument("--verbose", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
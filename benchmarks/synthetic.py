@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# Synthetic data
+# ------------------------
+# Same columns as the Kaggle credit card file (Time, V1..V28, Amount, Class),
+# with the fraud signal in a few V columns, so benchmarks need no download.
+N_FEATURES = 30
+
+
+def synthetic_transactions(n_rows=20000, fraud_rate=0.01, seed=42):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n_rows) < fraud_rate).astype(int)
+    V = rng.normal(size=(n_rows, 28))
+    V[y == 1, :4] += rng.normal(loc=3.0, size=(int(y.sum()), 4))
+
+    df = pd.DataFrame(V, columns=[f"V{i}" for i in range(1, 29)])
+    df.insert(0, "Time", np.sort(rng.uniform(0, 172800, n_rows)))
+    df["Amount"] = np.round(rng.lognormal(mean=3.5, sigma=1.2, size=n_rows), 2)
+    df["Class"] = y
+    return df
+
+
+def feature_rows(n_rows, seed=0):
+    """Model-ready float64 rows (30 features)."""
+    return np.random.default_rng(seed).normal(size=(n_rows, N_FEATURES))
@@ -0,0 +1,43 @@
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_transactions
+
+# ------------------------
+# src/train.py stage timings
+# ------------------------
+# python -m benchmarks.training --rows 20000
+# Trains on a synthetic CSV and reports the stage / per-model timings that
+# src/train.py measures itself.
+
+
+def run_training(work_dir, n_rows=20000, extra_args=()):
+    """Train all models into work_dir/models; returns (results, models dir)."""
+    from src.train import build_parser, main as train_main
+
+    work_dir = Path(work_dir)
+    data = work_dir / "transactions.csv"
+    synthetic_transactions(n_rows).to_csv(data, index=False)
+
+    args = build_parser().parse_args([
+        "--data", str(data), "--out_dir", str(work_dir / "models"),
+        "--cache_dir", str(work_dir / "data_cache"), *extra_args,
+    ])
+    timings = train_main(args)
+
+    results = [{"name": f"train|stage={stage}", "seconds": s} for stage, s in timings["stages"].items()]
+    for model, stages in timings["models"].items():
+        results += [{"name": f"train|model={model}|stage={stage}", "seconds": s} for stage, s in stages.items()]
+    results.append({"name": "train|wall", "seconds": timings["wall"], "rows": timings["train_rows"]})
+    return results, work_dir / "models"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    args, train_args = parser.parse_known_args()
+    with tempfile.TemporaryDirectory(prefix="bench-train-") as tmp:
+        results, _ = run_training(tmp, args.rows, train_args)
+    print(json.dumps(results, indent=2))
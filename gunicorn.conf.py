@@ -0,0 +1,18 @@
+import os
+
+# gunicorn -c gunicorn.conf.py backend.main:app
+#
+# The app is imported once in the master and every model is loaded before the
+# workers fork, so all workers share one read-only copy of the tree arrays
+# (copy-on-write pages; memory-mapped for the compiled forest artifact).
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    from backend.main import preload_models
+
+    preload_models()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from backend.scoring import Scorer
+from src.preprocess import load_data, basic_preprocess
+
+
+# ------------------------
+# Cascade band calibration
+# ------------------------
+# python -m src.cascade --data labeled.csv --models_dir models
+# The backend's model=cascade scores every row with the screening model and
+# escalates only rows with probability in [low, high). `low` is the highest
+# cut that still keeps the recall lost versus the escalation model within
+# max_recall_loss. `high` is the lowest cut that keeps the added false
+# positives within max_precision_loss of the escalation model's flags.
+# Both are written to <models_dir>/cascade.json.
+def calibrate_band(p_screen, esc_pred, y, max_recall_loss=0.01, max_precision_loss=0.01):
+    p_screen, esc_pred, y = np.asarray(p_screen), np.asarray(esc_pred), np.asarray(y)
+
+    # Frauds the escalation model catches; each one below `low` is lost recall
+    caught = np.sort(p_screen[(y == 1) & (esc_pred == 1)])
+    allowed = int(max_recall_loss * (y == 1).sum())
+    low = caught[allowed] if allowed < len(caught) else 1.0
+
+    # Legit rows the escalation model clears; each one at or above `high` is a new false positive
+    cleared = np.sort(p_screen[(y == 0) & (esc_pred == 0)])[::-1]
+    allowed = int(max_precision_loss * max(int((esc_pred == 1).sum()), 1))
+    high = np.nextafter(cleared[allowed], np.inf) if allowed < len(cleared) else low
+
+    # The precision cut is below the recall cut: keep the precision cut and
+    # escalate nothing. Lowering the cut only loses fewer frauds, so the recall
+    # budget still holds; export_cascade measures and records it either way.
+    if high < low:
+        low = high
+    return float(low), float(high)
+
+
+def cascade_predict(p_screen, esc_pred, low, high):
+    """Labels the cascade serves, and the mask of escalated rows."""
+    escalate = (p_screen >= low) & (p_screen < high)
+    return np.where(escalate, esc_pred, p_screen >= high).astype(np.int64), escalate
+
+
+def recall_precision(y, pred):
+    tp = int(((pred == 1) & (y == 1)).sum())
+    return tp / max(int((y == 1).sum()), 1), tp / max(int((pred == 1).sum()), 1)
+
+
+def recall_loss(y, esc_pred, pred):
+    """Share of all frauds the escalation model catches but the cascade misses (what max_recall_loss bounds)."""
+    lost = int(((y == 1) & (esc_pred == 1) & (pred == 0)).sum())
+    return lost / max(int((y == 1).sum()), 1)
+
+
+def export_cascade(screen, escalate, X, y, out_path, max_recall_loss=0.01, max_precision_loss=0.01,
+                   names=("logreg", "rf")):
+    y = np.asarray(y)
+    _, p_screen = Scorer(screen).score(X)
+    esc_pred, _ = Scorer(escalate).score(X)
+
+    low, high = calibrate_band(p_screen, esc_pred, y, max_recall_loss, max_precision_loss)
+    pred, escalated = cascade_predict(p_screen, esc_pred, low, high)
+    recall, precision = recall_precision(y, pred)
+    esc_recall, esc_precision = recall_precision(y, esc_pred)
+
+    loss = recall_loss(y, esc_pred, pred)
+    budget_met = loss <= max_recall_loss
+
+    config = {
+        "screen": names[0],
+        "escalate": names[1],
+        "low": low,
+        "high": high,
+        "max_recall_loss": max_recall_loss,
+        "max_precision_loss": max_precision_loss,
+        "calibration_rows": int(len(y)),
+        "escalated_fraction": float(escalated.mean()),
+        "recall": recall,
+        "precision": precision,
+        "recall_loss": loss,
+        "recall_budget_met": budget_met,
+    }
+    # Write then rename, like the model artifacts, so the backend never reads half a file
+    tmp = Path(str(out_path) + ".tmp")
+    tmp.write_text(json.dumps(config, indent=2))
+    os.replace(tmp, out_path)
+
+    print(f"Cascade {names[0]} -> {names[1]}: band [{low:.4f}, {high:.4f}) on {len(y)} rows")
+    print(f"  escalated: {escalated.mean():.2%} of rows")
+    print(f"  recall:    {esc_recall:.4f} ({names[1]}) -> {recall:.4f} (cascade)")
+    print(f"  precision: {esc_precision:.4f} ({names[1]}) -> {precision:.4f} (cascade)")
+    print(f"  recall loss vs {names[1]}: {loss:.4f} (budget {max_recall_loss:.4f})")
+    if not budget_met:
+        print(f"WARNING: recall loss {loss:.4f} exceeds max_recall_loss {max_recall_loss:.4f}")
+    print(f"Saved: {Path(out_path).name}")
+    return config
+
+
+def main(args):
+    models_dir = Path(args.models_dir)
+    X, y = basic_preprocess(load_data(args.data))
+    export_cascade(
+        joblib.load(models_dir / "logreg.pkl"),
+        joblib.load(models_dir / "rf.pkl"),
+        X, y, models_dir / "cascade.json",
+        max_recall_loss=args.max_recall_loss,
+        max_precision_loss=args.max_precision_loss,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", required=True, help="Labeled CSV, ideally not seen in training")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--max_recall_loss", type=float, default=0.01)
+    parser.add_argument("--max_precision_loss", type=float, default=0.01)
+    args = parser.parse_args()
+    main(args)
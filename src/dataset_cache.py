@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backend.registry import file_digest
+
+# ------------------------
+# Cached training dataset
+# ------------------------
+# The preprocessed X / y and the resampled X_res / y_res are written once as
+# .npy files under <cache_dir>/<key>/, where key hashes the CSV contents and
+# the preprocessing parameters. Later runs memory-map them instead of parsing
+# the CSV and re-running SMOTE. Bump CACHE_VERSION when preprocessing changes.
+CACHE_VERSION = 1
+ARRAYS = ("X", "y", "X_res", "y_res")
+
+
+def dataset_key(path, params):
+    h = hashlib.sha256()
+    h.update(file_digest(path).encode())
+    h.update(json.dumps({"cache_version": CACHE_VERSION, **params}, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def _save(entry, columns, params, data):
+    # Build in a temp dir and rename, so an interrupted run never leaves a
+    # half-written entry that a later run would treat as a hit
+    tmp = entry.with_name(entry.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, arr in zip(ARRAYS, data):
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(arr))
+    (tmp / "meta.json").write_text(json.dumps({"columns": list(columns), "params": params}, indent=2))
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp, entry)
+
+
+def _load(entry):
+    meta = json.loads((entry / "meta.json").read_text())
+    arrays = {name: np.load(entry / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+    X = pd.DataFrame(arrays["X"], columns=meta["columns"], copy=False)
+    X_res = pd.DataFrame(arrays["X_res"], columns=meta["columns"], copy=False)
+    return X, pd.Series(arrays["y"], name="Class"), X_res, pd.Series(arrays["y_res"], name="Class")
+
+
+def cached_dataset(path, build, params, cache_dir="data_cache", rebuild=False):
+    """Return (X, y, X_res, y_res) from the cache, or from build() and cache them."""
+    key = dataset_key(path, params)
+    entry = Path(cache_dir) / key
+
+    t0 = time.perf_counter()
+    if (entry / "meta.json").exists() and not rebuild:
+        data = _load(entry)
+        print(f"Dataset cache hit: {entry} ({len(data[2])} rows, {time.perf_counter() - t0:.2f}s)")
+        return data
+
+    reason = "rebuild requested" if rebuild else "no entry"
+    data = build()
+    _save(entry, data[0].columns, params, data)
+    print(f"Dataset cache miss ({reason}): built and saved {entry} in {time.perf_counter() - t0:.2f}s")
+    return data
@@ -0,0 +1,257 @@
+import argparse
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+
+from backend.scoring import Scorer
+from src.preprocess import StreamingPreprocessor
+
+
+# ------------------------
+# Streaming evaluation
+# ------------------------
+# Scores are counted into fixed bins per class instead of being kept and
+# sorted: ROC / PR curves, their AUCs and threshold tables come from the
+# cumulative bin counts, so memory is constant in the number of rows and
+# partial results from separate chunks or processes simply add up. The
+# default bins are uniform in logit space (fine near 0 and 1, where fraud
+# scores pile up) plus every 1% step, so round thresholds are exact.
+def default_edges(n_logit=4000, max_logit=15.0):
+    return np.union1d(np.linspace(0.0, 1.0, 101), expit(np.linspace(-max_logit, max_logit, n_logit)))
+
+
+REPORT_THRESHOLDS = (0.1, 0.3, 0.5, 0.7, 0.9)
+
+# np.trapz was renamed np.trapezoid in NumPy 2.0
+trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+def downsample(n, max_points):
+    """Indices of at most max_points of n curve points, first and last included."""
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(np.int64))
+
+
+class ScoreHistogram:
+    def __init__(self, edges=None):
+        # Bin k holds scores in (edges[k], edges[k + 1]]; the first bin also holds 0.0.
+        # Flagging bins k and up is then exactly `score > edges[k]`, the same
+        # comparison Scorer uses for served labels (except that exact zeros
+        # count as above edges[0]).
+        self.edges = default_edges() if edges is None else np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros((2, len(self.edges) - 1), dtype=np.int64)
+
+    def update(self, y_true, y_prob):
+        y_true = np.asarray(y_true).astype(bool)
+        y_prob = np.asarray(y_prob, dtype=np.float64)
+        keep = ~np.isnan(y_prob)
+        y_true, y_prob = y_true[keep], y_prob[keep]
+
+        n_bins = self.counts.shape[1]
+        idx = np.clip(np.searchsorted(self.edges, y_prob, side="left") - 1, 0, n_bins - 1)
+        self.counts[1] += np.bincount(idx[y_true], minlength=n_bins)
+        self.counts[0] += np.bincount(idx[~y_true], minlength=n_bins)
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge score histograms with different bin edges")
+        self.counts += other.counts
+        return self
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def _cumulative(self):
+        """(thresholds, tp, fp) for score > threshold, from the highest down, one point per non-empty bin."""
+        nonempty = np.flatnonzero(self.counts.sum(axis=0))[::-1]
+        tp = np.cumsum(self.counts[1][::-1])[::-1][nonempty]
+        fp = np.cumsum(self.counts[0][::-1])[::-1][nonempty]
+        # Leading point: nothing flagged
+        return (np.concatenate([[np.inf], self.edges[nonempty]]),
+                np.concatenate([[0], tp]), np.concatenate([[0], fp]))
+
+    def roc(self, max_points=None):
+        """(fpr, tpr, thresholds), optionally downsampled for plotting."""
+        thresholds, tp, fp = self._cumulative()
+        fpr = fp / max(fp[-1], 1)
+        tpr = tp / max(tp[-1], 1)
+        if max_points:
+            keep = downsample(len(fpr), max_points)
+            return fpr[keep], tpr[keep], thresholds[keep]
+        return fpr, tpr, thresholds
+
+    def roc_auc(self):
+        # Trapezoids over bin boundaries: scores tied within a bin count half, as in sklearn
+        fpr, tpr, _ = self.roc()
+        return float(trapezoid(tpr, fpr))
+
+    def precision_recall(self, max_points=None):
+        """(precision, recall, thresholds) for thresholds flagging at least one row."""
+        thresholds, tp, fp = self._cumulative()
+        flagged = tp + fp
+        tp, flagged, thresholds = tp[1:], flagged[1:], thresholds[1:]
+        precision = tp / np.maximum(flagged, 1)
+        recall = tp / max(tp[-1], 1) if len(tp) else tp
+        if max_points:
+            keep = downsample(len(precision), max_points)
+            return precision[keep], recall[keep], thresholds[keep]
+        return precision, recall, thresholds
+
+    def average_precision(self):
+        # Step-wise area, as sklearn's average_precision_score
+        precision, recall, _ = self.precision_recall()
+        return float(np.sum(np.diff(recall, prepend=0.0) * precision))
+
+    def confusion(self, threshold=0.5):
+        """[[tn, fp], [fn, tp]] for score > threshold, as served (snapped up to the next bin edge)."""
+        k = min(int(np.searchsorted(self.edges, threshold, side="left")), self.counts.shape[1])
+        tp, fp = int(self.counts[1, k:].sum()), int(self.counts[0, k:].sum())
+        fn, tn = int(self.counts[1, :k].sum()), int(self.counts[0, :k].sum())
+        return np.array([[tn, fp], [fn, tp]])
+
+    def threshold_table(self, thresholds=REPORT_THRESHOLDS):
+        rows = []
+        for t in thresholds:
+            (tn, fp), (fn, tp) = self.confusion(t)
+            precision = tp / (tp + fp) if tp + fp else 0.0
+            recall = tp / (tp + fn) if tp + fn else 0.0
+            rows.append({
+                "threshold": t,
+                "flagged": tp + fp,
+                "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+                "precision": precision,
+                "recall": recall,
+                "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+            })
+        return pd.DataFrame(rows)
+
+
+class StreamingEvaluator:
+    """Confusion counts of the model's own decisions plus a ScoreHistogram, updated chunk by chunk."""
+
+    def __init__(self, edges=None):
+        self.hist = ScoreHistogram(edges)
+        self.confusion = np.zeros((2, 2), dtype=np.int64)  # [actual, predicted]
+
+    def update(self, y_true, y_pred, y_prob=None):
+        y_true = np.asarray(y_true).astype(np.int64)
+        y_pred = np.asarray(y_pred).astype(np.int64)
+        self.confusion += np.bincount(y_true * 2 + y_pred, minlength=4).reshape(2, 2)
+        if y_prob is not None:
+            self.hist.update(y_true, y_prob)
+        return self
+
+    def merge(self, other):
+        self.confusion += other.confusion
+        self.hist.merge(other.hist)
+        return self
+
+    @property
+    def rows(self):
+        return int(self.confusion.sum())
+
+    def metrics(self):
+        (_, fp), (fn, tp) = self.confusion
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        return float(precision), float(recall), float(f1)
+
+    def report(self, name, thresholds=REPORT_THRESHOLDS):
+        print(f"\n--- Evaluating {name} ---")
+        if self.hist.total:
+            print("ROC AUC:", self.hist.roc_auc())
+            print("PR AUC (average precision):", self.hist.average_precision())
+        else:
+            print("No probability output.")
+
+        precision, recall, f1 = self.metrics()
+        print("Precision:", precision)
+        print("Recall:", recall)
+        print("F1:", f1)
+        if self.hist.total:
+            print(self.hist.threshold_table(thresholds).to_string(index=False, float_format="%.4f"))
+
+    def save(self, path):
+        np.savez(path, edges=self.hist.edges, counts=self.hist.counts, confusion=self.confusion)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        evaluator = cls(data["edges"])
+        evaluator.hist.counts[:] = data["counts"]
+        evaluator.confusion[:] = data["confusion"]
+        return evaluator
+
+
+# ------------------------
+# Chunked / parallel evaluation of a saved model
+# ------------------------
+# python -m src.evaluation --model models/rf.pkl --data big.csv --workers 4 --out rf_eval.npz
+# Chunks are scored in a process pool; each worker returns a small
+# StreamingEvaluator and the parent merges them.
+_MODELS = {}
+
+
+def _evaluate_chunk(model_path, X, y):
+    model = _MODELS.get(model_path)
+    if model is None:
+        model = _MODELS[model_path] = joblib.load(model_path)
+    labels, probs = Scorer(model).score(X)
+    return StreamingEvaluator().update(y, labels, probs)
+
+
+def evaluate_csv(model_path, data, chunksize=200_000, workers=1):
+    model = _MODELS[model_path] = joblib.load(model_path)
+    # Streaming models carry their scaling statistics; others get them from a first pass
+    prep = getattr(model, "preprocessor_", None)
+    if prep is None:
+        prep = StreamingPreprocessor(chunksize=chunksize).fit(data)
+    prep.chunksize = chunksize
+
+    total = StreamingEvaluator()
+    if workers <= 1:
+        for X, y in prep.iter_batches(data):
+            total.merge(_evaluate_chunk(model_path, X, y))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for X, y in prep.iter_batches(data):
+            # Bounded read-ahead: at most two chunks per worker in memory
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    total.merge(fut.result())
+            pending.add(pool.submit(_evaluate_chunk, model_path, X, y))
+        for fut in pending:
+            total.merge(fut.result())
+    return total
+
+
+def main(args):
+    t0 = time.perf_counter()
+    evaluator = evaluate_csv(args.model, args.data, chunksize=args.chunksize, workers=args.workers)
+    evaluator.report(f"{args.model} on {args.data}")
+    print(f"\n{evaluator.rows} rows in {time.perf_counter() - t0:.2f}s")
+    if args.out:
+        evaluator.save(args.out)
+        print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--data", required=True, help="Labeled CSV")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=1, help="Processes scoring chunks in parallel")
+    parser.add_argument("--out", default=None, help="Save the merged counts (.npz) for utils_plots")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,72 @@
+import argparse
+import io
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.linear import fuse_linear_pipeline
+
+
+# ------------------------
+# Fused linear export
+# ------------------------
+# python -m src.fuse --model models/logreg.pkl
+# Writes models/logreg.fused.pkl, which the backend serves in place of the
+# PCA + LogisticRegression pipeline (LINEAR_ENGINE=fused, the default).
+def pickled_size(obj):
+    buf = io.BytesIO()
+    joblib.dump(obj, buf)
+    return buf.tell()
+
+
+def per_row_us(fn, X, repeats=20):
+    fn(X)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - t0) / repeats / len(X) * 1e6
+
+
+def export_fused(pipe, X_check, out_path, rtol=1e-9, atol=1e-12):
+    fused = fuse_linear_pipeline(pipe)
+
+    # Refuse to export a scorer that does not reproduce the pipeline
+    expected = pipe.predict_proba(X_check)[:, 1]
+    got = fused.predict_proba(X_check)[:, 1]
+    np.testing.assert_allclose(got, expected, rtol=rtol, atol=atol)
+    max_err = np.abs(got - expected).max()
+
+    from src.train import save_artifact
+    save_artifact(fused, out_path)
+
+    X_one = X_check[:1]
+    print(f"Fused {type(pipe).__name__} -> {fused.n_features_in_} weights + bias (max |dp| = {max_err:.2e})")
+    print(f"  artifact size: {pickled_size(pipe) / 1e3:.1f} KB -> {pickled_size(fused) / 1e3:.1f} KB")
+    print(f"  per row, batch {len(X_check)}: {per_row_us(pipe.predict_proba, X_check):.3f} us -> "
+          f"{per_row_us(fused.predict_proba, X_check):.3f} us")
+    print(f"  single row: {per_row_us(pipe.predict_proba, X_one):.1f} us -> "
+          f"{per_row_us(fused.predict_proba, X_one):.1f} us")
+    print(f"Saved: {Path(out_path).name}")
+    return fused
+
+
+def main(args):
+    pipe = joblib.load(args.model)
+    rng = np.random.default_rng(42)
+    X_check = rng.normal(scale=2.0, size=(args.rows, pipe.n_features_in_))
+    if hasattr(pipe, "feature_names_in_"):
+        X_check = pd.DataFrame(X_check, columns=pipe.feature_names_in_)
+    out = args.out or Path(args.model).with_suffix(".fused.pkl")
+    export_fused(pipe, X_check, out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/logreg.pkl")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--rows", type=int, default=4000)
+    args = parser.parse_args()
+    main(args)
@@ -1,3 +1,7 @@
+import os
+import time
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
@@ -29,3 +33,196 @@ def resample_smote(X, y, random_state=42):
     sm = SMOTE(random_state=random_state)
     X_res, y_res = sm.fit_resample(X, y)
     return X_res, y_res
+
+
+def undersample(X, y, majority_ratio=1.0, random_state=42):
+    # Keep every minority row and majority_ratio x as many majority rows
+    from imblearn.under_sampling import RandomUnderSampler
+
+    rus = RandomUnderSampler(sampling_strategy=1.0 / majority_ratio, random_state=random_state)
+    return rus.fit_resample(X, y)
+
+
+def resample_smote_sample(X, y, majority_ratio=10.0, random_state=42):
+    # SMOTE on a majority sample of majority_ratio x the minority count, so
+    # the output grows with the minority class instead of the majority
+    X_s, y_s = undersample(X, y, majority_ratio=majority_ratio, random_state=random_state)
+    return resample_smote(X_s, y_s, random_state=random_state)
+
+
+RESAMPLE_STRATEGIES = {
+    "smote": resample_smote,
+    "smote_sample": resample_smote_sample,
+    "undersample": undersample,
+    # No resampling: the models' class_weight="balanced" does the reweighting
+    "class_weight": lambda X, y, random_state=42: (X, y),
+}
+
+
+def resample(X, y, strategy="smote", random_state=42):
+    t0 = time.perf_counter()
+    X_res, y_res = RESAMPLE_STRATEGIES[strategy](X, y, random_state=random_state)
+    print(f"Resample ({strategy}): {len(X)} -> {len(X_res)} rows in {time.perf_counter() - t0:.2f}s")
+    return X_res, y_res
+
+
+# ------------------------
+# Out-of-core preprocessing
+# ------------------------
+# Same steps as basic_preprocess, but over pd.read_csv chunks: float32
+# columns, de-duplication by row digest across chunks, and the median fill /
+# RobustScaler statistics taken from a bounded reservoir sample. The data
+# itself is never held in memory, but de-duplication is not free: fit keeps
+# an 8-byte digest per unique row, and the resulting keep mask (1 bit per
+# file row) is kept so later passes skip hashing. Memory therefore grows with
+# the number of unique rows, e.g. ~0.8 GB of digests per 100M unique rows.
+FEATURE_COLUMNS = ["Time"] + [f"V{i}" for i in range(1, 29)] + ["Amount"]
+CSV_DTYPES = {c: np.float32 for c in FEATURE_COLUMNS + ["Class"]}
+
+
+class ReservoirSample:
+    """Uniform sample of at most `size` rows from a stream of 2D float32 arrays."""
+
+    def __init__(self, size=100_000, random_state=42):
+        self.size = size
+        self.rng = np.random.default_rng(random_state)
+        self.seen = 0
+        self.rows = None
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if self.rows is None:
+            self.rows = np.empty((self.size, X.shape[1]), dtype=np.float32)
+
+        fill = min(max(self.size - self.seen, 0), len(X))
+        self.rows[self.seen:self.seen + fill] = X[:fill]
+
+        # Row number t (0-based) replaces a random slot with probability size / (t + 1)
+        rest = X[fill:]
+        if len(rest):
+            t = self.seen + fill + np.arange(len(rest))
+            slot = (self.rng.random(len(rest)) * (t + 1)).astype(np.int64)
+            keep = slot < self.size
+            self.rows[slot[keep]] = rest[keep]
+        self.seen += len(X)
+
+    def sample(self):
+        return self.rows[:min(self.seen, self.size)]
+
+
+class RowDeduplicator:
+    """Drops rows already seen in this or an earlier chunk (keep="first", like drop_duplicates)."""
+
+    def __init__(self):
+        # Sorted uint64 digests of every unique row so far (8 bytes per row),
+        # held as runs of decreasing size. A run is merged into the one before
+        # it once it is at least half as long, so each digest is re-sorted
+        # O(log n) times and a lookup checks O(log n) runs.
+        self._runs = []
+
+    def new_rows(self, values):
+        from backend.cache import row_digests
+
+        digests = row_digests(values)
+        mask = np.zeros(len(digests), dtype=bool)
+        mask[np.unique(digests, return_index=True)[1]] = True
+
+        for run in self._runs:
+            pos = np.minimum(np.searchsorted(run, digests), len(run) - 1)
+            mask &= run[pos] != digests
+
+        if not mask.any():
+            # All repeats (e.g. a resubmitted chunk): an empty run would break the lookup
+            return mask
+        self._runs.append(np.sort(digests[mask]))
+        while len(self._runs) > 1 and 2 * len(self._runs[-1]) >= len(self._runs[-2]):
+            last = self._runs.pop()
+            self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]))
+        return mask
+
+    @property
+    def n_unique(self):
+        return sum(len(run) for run in self._runs)
+
+
+class StreamingPreprocessor:
+    def __init__(self, chunksize=100_000, sample_size=100_000, scale_amount_time=True):
+        self.chunksize = chunksize
+        self.sample_size = sample_size
+        self.scale_amount_time = scale_amount_time
+
+    def __getstate__(self):
+        # Saved with streaming models; the stats sample is only needed while training
+        state = self.__dict__.copy()
+        state.pop("sample_", None)
+        state.pop("unique_masks_", None)
+        return state
+
+    def _source_key(self, path):
+        # The keep masks from fit only apply to the same, unchanged file read in the same chunks
+        stat = os.stat(path)
+        return str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns, self.chunksize
+
+    def iter_unique(self, path, record=None):
+        """Unique rows per chunk. `record`, if a list, receives each chunk's packed keep mask."""
+        masks = getattr(self, "unique_masks_", None)
+        reuse = masks is not None and masks[0] == self._source_key(path)
+        dedup = None if reuse else RowDeduplicator()
+
+        for i, chunk in enumerate(pd.read_csv(path, chunksize=self.chunksize, dtype=CSV_DTYPES)):
+            if reuse:
+                keep = np.unpackbits(masks[1][i], count=len(chunk)).astype(bool)
+            else:
+                keep = dedup.new_rows(chunk.to_numpy(dtype=np.float32))
+            if record is not None:
+                record.append(np.packbits(keep))
+            chunk = chunk[keep]
+            if len(chunk):
+                yield chunk
+
+    def fit(self, path):
+        """First pass: row and class counts plus approximate medians / quantiles."""
+        reservoir = ReservoirSample(self.sample_size)
+        self.n_rows_ = 0
+        self.unique_masks_ = None
+        packed = []
+        counts = pd.Series(dtype=np.int64)
+        columns = None
+        for chunk in self.iter_unique(path, record=packed):
+            columns = chunk.columns
+            reservoir.update(chunk.to_numpy(dtype=np.float32))
+            counts = counts.add(chunk["Class"].value_counts(), fill_value=0)
+            self.n_rows_ += len(chunk)
+        self.class_counts_ = {int(c): int(n) for c, n in counts.items()}
+        # Later passes over the same file reuse the de-duplication result
+        self.unique_masks_ = (self._source_key(path), packed)
+
+        # Kept (bounded by sample_size) for fitting things like the PCA size
+        self.sample_ = pd.DataFrame(reservoir.sample(), columns=columns)
+        self.medians_ = self.sample_.median()
+        sample = self.sample_.fillna(self.medians_)
+
+        if self.scale_amount_time:
+            # RobustScaler: (x - median) / IQR, with a zero IQR left unscaled
+            q25, q50, q75 = sample[["Amount", "Time"]].quantile([0.25, 0.5, 0.75]).to_numpy()
+            iqr = q75 - q25
+            self.center_ = dict(zip(["Amount", "Time"], q50))
+            self.scale_ = dict(zip(["Amount", "Time"], np.where(iqr == 0, 1.0, iqr)))
+        return self
+
+    def transform(self, chunk):
+        df = chunk.fillna(self.medians_)
+        if self.scale_amount_time:
+            df["scaled_amount"] = ((df["Amount"] - self.center_["Amount"]) / self.scale_["Amount"]).astype(np.float32)
+            df["scaled_time"] = ((df["Time"] - self.center_["Time"]) / self.scale_["Time"]).astype(np.float32)
+            df = df.drop(["Time", "Amount"], axis=1)
+            cols = ["scaled_amount", "scaled_time"] + [c for c in df.columns if c not in ("scaled_amount", "scaled_time")]
+            df = df[cols]
+        X = df.drop("Class", axis=1)
+        y = df["Class"].round().astype(np.int8)
+        return X, y
+
+    def iter_batches(self, path):
+        """Later passes: preprocessed (X, y) per chunk, float32 features."""
+        for chunk in self.iter_unique(path):
+            yield self.transform(chunk)
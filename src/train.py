@@ -1,110 +1,541 @@
 import argparse
+import itertools
+import math
+import os
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 import joblib
 import numpy as np
+import pandas as pd
 
-from sklearn.linear_model import LogisticRegression
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.pipeline import make_pipeline
-from sklearn.decomposition import PCA
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import precision_score, recall_score, f1_score, roc_auc_score
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, GridSearchCV, HalvingGridSearchCV
+from sklearn.metrics import f1_score
 
 from sklearn.ensemble import RandomForestClassifier
 
-from src.preprocess import load_data, basic_preprocess, resample_smote
+from backend.forest import CompiledForest
+from backend.scoring import Scorer
+from src.cascade import export_cascade
+from src.dataset_cache import cached_dataset
+from src.evaluation import StreamingEvaluator
+from src.fuse import export_fused
+from src.preprocess import load_data, basic_preprocess, resample, RESAMPLE_STRATEGIES, StreamingPreprocessor
 
 
 # ------------------------
 # Logistic Regression
 # ------------------------
-def train_logreg(X_train, y_train):
-    pipe = make_pipeline(
-        PCA(n_components=0.95, random_state=42),
-        LogisticRegression(
-            max_iter=500,
-            class_weight="balanced",
-            solver="liblinear",
-            random_state=42
-        )
-    )
+LOGREG_GRID = {"logisticregression__C": [0.1, 1, 10]}
+# Halving spends most of its budget on the survivors, so it can afford a wider grid
+LOGREG_HALVING_GRID = {"logisticregression__C": [0.01, 0.03, 0.1, 0.3, 1, 3, 10, 30, 100]}
+
 
-    params = {"logisticregression__C": [0.1, 1, 10]}
+def train_logreg(X_train, y_train, n_jobs=-1, search="grid", cache_transformers=False):
+    with tempfile.TemporaryDirectory(prefix="pipeline-cache-") as cache:
+        # Pipeline memory: each fold's PCA is fitted once and reused for every C.
+        # Off by default: it pays off only when the transformers cost more than
+        # hashing and storing their inputs / outputs (not the case for a 30-feature PCA)
+        pipe = make_pipeline(
+            PCA(n_components=0.95, random_state=42),
+            LogisticRegression(
+                max_iter=500,
+                class_weight="balanced",
+                solver="liblinear",
+                random_state=42
+            ),
+            memory=joblib.Memory(cache, verbose=0) if cache_transformers else None,
+        )
 
-    grid = GridSearchCV(pipe, params, cv=3, scoring="f1", n_jobs=-1)
-    grid.fit(X_train, y_train)
+        # Search on the bare array: when it is a memmap, joblib hands the search
+        # workers the file instead of pickling the matrix to each of them
+        if search == "halving":
+            # Candidates start on a small sample; only the best see all rows
+            grid = HalvingGridSearchCV(pipe, LOGREG_HALVING_GRID, cv=3, scoring="f1", n_jobs=n_jobs,
+                                       refit=False, factor=3, random_state=42)
+        else:
+            grid = GridSearchCV(pipe, LOGREG_GRID, cv=3, scoring="f1", n_jobs=n_jobs, refit=False)
+        grid.fit(np.asarray(X_train), y_train)
 
     print("Best params (LogReg):", grid.best_params_)
-    return grid.best_estimator_
+    return clone(pipe).set_params(memory=None, **grid.best_params_).fit(X_train, y_train)
 
 
 # ------------------------
 # Random Forest
 # ------------------------
-def train_rf(X_train, y_train):
+def train_rf(X_train, y_train, n_jobs=-1):
     model = RandomForestClassifier(
         n_estimators=150,
         random_state=42,
         class_weight="balanced",
-        n_jobs=-1
+        n_jobs=n_jobs
     )
     model.fit(X_train, y_train)
     return model
 
 
+# Forest search: successive halving where the resource is the number of
+# trees. warm_start forests only grow the missing trees at each rung, and
+# candidates are ranked by out-of-bag F1, so no CV refits are needed.
+RF_GRID = {
+    "max_depth": [None, 12],
+    "min_samples_leaf": [1, 4],
+    "max_features": ["sqrt", 0.3],
+}
+RF_TREE_STEPS = (10, 40, 150)
+
+
+def oob_f1(forest, y):
+    proba = forest.oob_decision_function_
+    seen = ~np.isnan(proba).any(axis=1)
+    return f1_score(np.asarray(y)[seen], forest.classes_[proba[seen].argmax(axis=1)])
+
+
+def search_rf(X_train, y_train, n_jobs=-1, grid=RF_GRID, tree_steps=RF_TREE_STEPS, factor=3):
+    keys = list(grid)
+    candidates = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    forests = {
+        i: RandomForestClassifier(
+            n_estimators=0, warm_start=True, oob_score=True, random_state=42,
+            class_weight="balanced", n_jobs=n_jobs, **params,
+        )
+        for i, params in enumerate(candidates)
+    }
+
+    alive = list(forests)
+    scores = {}
+    for step, n_trees in enumerate(tree_steps):
+        for i in alive:
+            forests[i].set_params(n_estimators=n_trees)
+            with warnings.catch_warnings():
+                # Same rows every rung, so the balanced weights do not drift
+                warnings.filterwarnings("ignore", message=".*not recommended for warm_start.*")
+                forests[i].fit(X_train, y_train)
+            scores[i] = oob_f1(forests[i], y_train)
+        alive.sort(key=scores.get, reverse=True)
+        print(f"RF search: {n_trees} trees, {len(alive)} candidates, best OOB F1 {scores[alive[0]]:.4f}")
+        if step < len(tree_steps) - 1:
+            for i in alive[math.ceil(len(alive) / factor):]:
+                del forests[i]
+            alive = alive[:math.ceil(len(alive) / factor)]
+
+    best = forests[alive[0]]
+    print("Best params (RF):", {**candidates[alive[0]], "n_estimators": best.n_estimators})
+    # Serve it as a plain forest: drop the per-row OOB arrays from the artifact
+    best.set_params(warm_start=False, oob_score=False)
+    for attr in ("oob_score_", "oob_decision_function_"):
+        if hasattr(best, attr):
+            delattr(best, attr)
+    return best
+
+
+# ------------------------
+# Streaming (out-of-core) Logistic Regression
+# ------------------------
+# Own seed for the split: data generated with np.random.default_rng(42) (like
+# benchmarks/synthetic.py) would otherwise draw the very same numbers and put
+# every row it labeled from them on one side of the split.
+HOLDOUT_SEED = 20_170_911
+
+
+def holdout_mask(n, rng, test_size=0.2):
+    # Same rng seed every pass over the same chunks -> same split every pass
+    return rng.random(n) < test_size
+
+
+def fit_incremental_pca(prep, path, test_size=0.2):
+    # Components for 95% variance, like PCA(n_components=0.95), from the stats sample
+    sample_X, _ = prep.transform(prep.sample_)
+    n_components = int(np.searchsorted(np.cumsum(PCA().fit(sample_X).explained_variance_ratio_), 0.95) + 1)
+
+    ipca = IncrementalPCA(n_components=n_components)
+    rng = np.random.default_rng(HOLDOUT_SEED)
+    carry = None
+    for X, _ in prep.iter_batches(path):
+        X = X[~holdout_mask(len(X), rng, test_size)]
+        # IncrementalPCA needs at least n_components rows per partial_fit
+        X = X if carry is None else pd.concat([carry, X])
+        if len(X) < n_components:
+            carry = X
+            continue
+        ipca.partial_fit(X)
+        carry = None
+    return ipca
+
+
+def fit_component_scaler(prep, ipca):
+    # Unit-variance components, so one SGD step size suits every weight; from the stats sample
+    sample_X, _ = prep.transform(prep.sample_)
+    return StandardScaler().fit(ipca.transform(sample_X))
+
+
+def save_checkpoint(ipca, scaler, clf, prep, path, epoch, chunk):
+    pipe = make_pipeline(ipca, scaler, clf)
+    pipe.preprocessor_ = prep
+    pipe.checkpoint_ = {"epoch": epoch, "chunk": chunk}
+    save_artifact(pipe, path)
+    print(f"Checkpoint: epoch {epoch}, chunk {chunk} -> {Path(path).name}")
+
+
+def train_logreg_streaming(prep, path, epochs=3, test_size=0.2, checkpoint=None, checkpoint_every=0, resume=False):
+    """IncrementalPCA + SGD logistic regression fitted chunk by chunk with partial_fit."""
+    if resume and checkpoint is not None and Path(checkpoint).exists():
+        ckpt = joblib.load(checkpoint)
+        ipca, scaler, clf = (step for _, step in ckpt.steps)
+        start_epoch, start_chunk = ckpt.checkpoint_["epoch"], ckpt.checkpoint_["chunk"]
+        print(f"Resuming from {Path(checkpoint).name}: epoch {start_epoch}, chunk {start_chunk}")
+    else:
+        ipca = fit_incremental_pca(prep, path, test_size)
+        scaler = fit_component_scaler(prep, ipca)
+        # No SMOTE on a stream: class_weight="balanced" from the exact class counts instead
+        counts = prep.class_counts_
+        class_weight = {c: prep.n_rows_ / (len(counts) * k) for c, k in counts.items()}
+        # A fixed step: the default "optimal" schedule starts with huge steps, which the
+        # ~100x fraud weight turns into intercepts in the hundreds
+        clf = SGDClassifier(loss="log_loss", class_weight=class_weight, learning_rate="constant",
+                            eta0=0.01, alpha=1e-4, random_state=42)
+        start_epoch, start_chunk = 0, 0
+    classes = np.array(sorted(prep.class_counts_))
+
+    for epoch in range(start_epoch, epochs):
+        rng = np.random.default_rng(HOLDOUT_SEED)
+        shuffle = np.random.default_rng(epoch)
+        for i, (X, y) in enumerate(prep.iter_batches(path)):
+            # Draw the holdout mask for skipped chunks too, so the split stays the same
+            train = ~holdout_mask(len(X), rng, test_size)
+            if (epoch == start_epoch and i < start_chunk) or not train.any():
+                continue
+            order = shuffle.permutation(int(train.sum()))
+            Z = scaler.transform(ipca.transform(X[train]))
+            clf.partial_fit(Z[order], y[train].to_numpy()[order], classes=classes)
+            if checkpoint_every and (i + 1) % checkpoint_every == 0:
+                save_checkpoint(ipca, scaler, clf, prep, checkpoint, epoch, i + 1)
+        print(f"Epoch {epoch + 1}/{epochs} done")
+        if checkpoint_every:
+            save_checkpoint(ipca, scaler, clf, prep, checkpoint, epoch + 1, 0)
+
+    pipe = make_pipeline(ipca, scaler, clf)
+    # Scaling statistics travel with the model, so --update preprocesses new data the same way
+    pipe.preprocessor_ = prep
+    return pipe
+
+
+def update_logreg(pipe, path, chunksize=100_000):
+    """Continue training a deployed streaming model on new labeled data (one pass, test-then-train)."""
+    clf = pipe.steps[-1][1]
+    if not isinstance(clf, SGDClassifier) or getattr(pipe, "preprocessor_", None) is None:
+        raise SystemExit("--update needs a model trained with --chunksize (IncrementalPCA + SGD).")
+
+    # The PCA basis and scaling stay fixed: moving them would invalidate the learned weights
+    prep = pipe.preprocessor_
+    prep.chunksize = chunksize
+    scorer = Scorer(pipe)
+    evaluator = StreamingEvaluator()
+    X = None
+    for X, y in prep.iter_batches(path):
+        # Score each chunk before learning from it: an honest estimate with no holdout
+        labels, probs = scorer.score(X)
+        evaluator.update(y.to_numpy(), labels, probs)
+        clf.partial_fit(pipe[:-1].transform(X), y.to_numpy(), classes=clf.classes_)
+    if X is None:
+        raise SystemExit("No rows to update from.")
+    evaluator.report("Logistic Regression (before each update chunk)")
+    return pipe, X
+
+
+def evaluate_streaming(model, prep, path, name, test_size=0.2):
+    # Held-out rows are folded into fixed-size counts chunk by chunk
+    rng = np.random.default_rng(HOLDOUT_SEED)
+    scorer = Scorer(model)
+    evaluator = StreamingEvaluator()
+    X_last = None
+    for X, y in prep.iter_batches(path):
+        test = holdout_mask(len(X), rng, test_size)
+        if not test.any():
+            continue
+        X_last = X[test]
+        labels, probs = scorer.score(X_last)
+        evaluator.update(y[test].to_numpy(), labels, probs)
+    evaluator.report(name)
+    return X_last
+
+
+def main_streaming(args):
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(exist_ok=True)
+
+    if args.update:
+        data = sys.stdin if args.data == "-" else args.data
+        print(f">>> Updating {args.update} with {args.data}...")
+        logreg, X_check = update_logreg(joblib.load(args.update), data, chunksize=args.chunksize or 100_000)
+        # Written atomically; a backend with MODEL_WATCH_INTERVAL set hot-swaps it
+        save_artifact(logreg, out_dir / "logreg.pkl")
+        print("Saved: logreg.pkl")
+        export_fused(logreg, X_check, out_dir / "logreg.fused.pkl")
+        return
+
+    print(f">>> Streaming {args.data} in chunks of {args.chunksize} rows...")
+    prep = StreamingPreprocessor(chunksize=args.chunksize).fit(args.data)
+    print(f"Unique rows: {prep.n_rows_}, class counts: {prep.class_counts_}")
+
+    print("\n>>> Training Logistic Regression (IncrementalPCA + SGD)...")
+    logreg = train_logreg_streaming(
+        prep, args.data, epochs=args.epochs, checkpoint=out_dir / "logreg.ckpt.pkl",
+        checkpoint_every=args.checkpoint_every, resume=args.resume,
+    )
+    logreg.decision_threshold_ = args.logreg_threshold
+    X_check = evaluate_streaming(logreg, prep, args.data, "Logistic Regression (streaming)")
+    save_artifact(logreg, out_dir / "logreg.pkl")
+    print("Saved: logreg.pkl")
+    export_fused(logreg, X_check, out_dir / "logreg.fused.pkl")
+
+    print("\nRandom Forest needs the full training matrix in memory; skipped in streaming mode.")
+    print("\n>>> Training Complete!")
+
+
+# ------------------------
+# Save
+# ------------------------
+def save_artifact(obj, path):
+    # Write then rename, so a running backend never maps or hot-reloads a
+    # half-written file and keeps its old mapping valid until it swaps
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+
+
 # ------------------------
 # Evaluation
 # ------------------------
 def evaluate(model, X_test, y_test, name):
-    print(f"\n--- Evaluating {name} ---")
-    y_pred = model.predict(X_test)
+    # Histogram-based ROC / PR AUC and threshold table (src/evaluation.py)
+    y_pred, y_prob = Scorer(model).score(X_test)
+    evaluator = StreamingEvaluator().update(y_test, y_pred, y_prob)
+    evaluator.report(name)
+    return evaluator
+
+
+# ------------------------
+# Parallel model jobs
+# ------------------------
+@contextmanager
+def timed(timings, stage):
+    t0 = time.perf_counter()
+    yield
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - t0
+
+
+def job_logreg(X_train, y_train, X_test, y_test, out_dir, n_jobs, opts, timings):
+    print("\n>>> Training Logistic Regression...")
+    with timed(timings, "fit"):
+        logreg = train_logreg(X_train, y_train, n_jobs=n_jobs, search=opts["search"],
+                              cache_transformers=opts["cache_transformers"])
+    logreg.decision_threshold_ = opts["threshold"]
+    with timed(timings, "evaluate"):
+        evaluate(logreg, X_test, y_test, "Logistic Regression")
+    with timed(timings, "save"):
+        save_artifact(logreg, out_dir / "logreg.pkl")
+        print("Saved: logreg.pkl")
+        # PCA + LogisticRegression folded into one weight vector for serving
+        export_fused(logreg, X_test, out_dir / "logreg.fused.pkl")
+
+
+def job_rf(X_train, y_train, X_test, y_test, out_dir, n_jobs, opts, timings):
+    print("\n>>> Training Random Forest...")
+    with timed(timings, "fit"):
+        if opts["rf_search"]:
+            rf = search_rf(X_train, y_train, n_jobs=n_jobs)
+        else:
+            rf = train_rf(X_train, y_train, n_jobs=n_jobs)
+    rf.decision_threshold_ = opts["threshold"]
+    with timed(timings, "evaluate"):
+        evaluate(rf, X_test, y_test, "Random Forest")
+    with timed(timings, "save"):
+        save_artifact(rf, out_dir / "rf.pkl")
+        print("Saved: rf.pkl")
+        # Uncompressed node arrays, memory-mapped by the backend (FOREST_ENGINE=compiled)
+        save_artifact(CompiledForest(rf), out_dir / "rf.compiled.pkl")
+        print("Saved: rf.compiled.pkl")
+
+
+MODEL_JOBS = {"logreg": job_logreg, "rf": job_rf}
+
+
+def share_split(data_dir, columns, **arrays):
+    # Every job maps these files instead of receiving a pickled copy
+    for name, arr in arrays.items():
+        np.save(Path(data_dir) / f"{name}.npy", np.ascontiguousarray(arr))
+    (Path(data_dir) / "columns.txt").write_text("\n".join(map(str, columns)))
+
+
+def load_split(data_dir):
+    columns = (Path(data_dir) / "columns.txt").read_text().split("\n")
+    load = lambda name: np.load(Path(data_dir) / f"{name}.npy", mmap_mode="r")
+    X_train = pd.DataFrame(load("X_train"), columns=columns, copy=False)
+    X_test = pd.DataFrame(load("X_test"), columns=columns, copy=False)
+    return X_train, pd.Series(load("y_train")), X_test, pd.Series(load("y_test"))
 
-    try:
-        y_prob = model.predict_proba(X_test)[:, 1]
-        print("ROC AUC:", roc_auc_score(y_test, y_prob))
-    except:
-        print("No probability output.")
 
-    print("Precision:", precision_score(y_test, y_pred))
-    print("Recall:", recall_score(y_test, y_pred))
-    print("F1:", f1_score(y_test, y_pred))
+def run_job(name, data_dir, out_dir, n_jobs, opts):
+    """Train, evaluate and save one model; returns its per-stage timings."""
+    from threadpoolctl import threadpool_limits
+
+    timings = {}
+    t0 = time.perf_counter()
+    # Keep BLAS inside the job's core budget too
+    with threadpool_limits(limits=n_jobs):
+        X_train, y_train, X_test, y_test = load_split(data_dir)
+        MODEL_JOBS[name](X_train, y_train, X_test, y_test, Path(out_dir), n_jobs, opts, timings)
+    timings["total"] = time.perf_counter() - t0
+    return timings
+
+
+def core_budgets(names, cores):
+    # Even split, the remainder going to the forest, at least one core each
+    share, extra = divmod(cores, len(names))
+    return {name: max(1, share + (extra if name == "rf" else 0)) for name in names}
+
+
+def print_timings(stages, model_timings, budgets, wall, n_train):
+    print(f"\n>>> Timing summary ({n_train} training rows)")
+    for stage, seconds in stages.items():
+        print(f"  {stage:<22}{seconds:8.2f}s")
+    for name, timings in model_timings.items():
+        parts = "  ".join(f"{k} {v:.2f}s" for k, v in timings.items() if k != "total")
+        print(f"  {name:<22}{timings['total']:8.2f}s  ({budgets[name]} cores: {parts})")
+    print(f"  {'wall clock':<22}{wall:8.2f}s")
 
 
 # ------------------------
 # MAIN
 # ------------------------
 def main(args):
+    if args.chunksize or args.update:
+        return main_streaming(args)
+
+    names = [m.strip() for m in args.models.split(",") if m.strip()]
+    unknown = [m for m in names if m not in MODEL_JOBS]
+    if unknown or not names:
+        raise SystemExit(f"--models: choose from {', '.join(MODEL_JOBS)} (got {args.models!r})")
+
+    t_start = time.perf_counter()
+    stages = {}
     print(">>> Loading data...")
-    df = load_data(args.data)
-    X, y = basic_preprocess(df)
-    X_res, y_res = resample_smote(X, y)
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_res, y_res, test_size=0.2, random_state=42, stratify=y_res
-    )
+    def build():
+        X, y = basic_preprocess(load_data(args.data))
+        X_res, y_res = resample(X, y, strategy=args.resample, random_state=42)
+        return X, y, X_res, y_res
 
+    params = {"scale_amount_time": True, "resample": args.resample, "random_state": 42}
+    with timed(stages, "load + preprocess"):
+        X, y, X_res, y_res = cached_dataset(
+            args.data, build, params, cache_dir=args.cache_dir, rebuild=args.rebuild_cache
+        )
+
+    with timed(stages, "split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X_res, y_res, test_size=0.2, random_state=42, stratify=y_res
+        )
+
+    n_train = len(X_train)
     out_dir = Path(args.out_dir)
     out_dir.mkdir(exist_ok=True)
+    thresholds = {"logreg": args.logreg_threshold, "rf": args.rf_threshold}
+    opts = {
+        name: {"threshold": thresholds[name], "search": args.search, "rf_search": args.rf_search,
+               "cache_transformers": args.cache_transformers}
+        for name in names
+    }
 
-    # Logistic Regression
-    print("\n>>> Training Logistic Regression...")
-    logreg = train_logreg(X_train, y_train)
-    evaluate(logreg, X_test, y_test, "Logistic Regression")
-    joblib.dump(logreg, out_dir / "logreg.pkl")
-    print("Saved: logreg.pkl")
+    # Concurrent jobs split the cores; jobs run one after the other get them all
+    workers = max(1, min(len(names), args.parallel))
+    cores = args.cores or os.cpu_count() or 1
+    budgets = core_budgets(names, cores) if workers > 1 else {name: cores for name in names}
 
-    # Random Forest
-    print("\n>>> Training Random Forest...")
-    rf = train_rf(X_train, y_train)
-    evaluate(rf, X_test, y_test, "Random Forest")
-    joblib.dump(rf, out_dir / "rf.pkl")
-    print("Saved: rf.pkl")
+    model_timings = {}
+    with tempfile.TemporaryDirectory(prefix="train-data-") as data_dir:
+        with timed(stages, "share data"):
+            share_split(data_dir, X_train.columns, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test)
+        del X, y, X_res, y_res, X_train, X_test, y_train, y_test
+
+        if workers == 1:
+            for name in names:
+                model_timings[name] = run_job(name, data_dir, out_dir, budgets[name], opts[name])
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    name: pool.submit(run_job, name, data_dir, out_dir, budgets[name], opts[name])
+                    for name in names
+                }
+                model_timings = {name: f.result() for name, f in futures.items()}
 
+        # Band for the backend's model=cascade (logreg screens, rf takes the uncertain rows)
+        if {"logreg", "rf"} <= set(names):
+            print("\n>>> Calibrating cascade...")
+            with timed(stages, "cascade calibration"):
+                _, _, X_test, y_test = load_split(data_dir)
+                export_cascade(
+                    joblib.load(out_dir / "logreg.pkl"), joblib.load(out_dir / "rf.pkl"),
+                    X_test, y_test, out_dir / "cascade.json",
+                    max_recall_loss=args.cascade_recall_loss, max_precision_loss=args.cascade_precision_loss,
+                )
+
+    wall = time.perf_counter() - t_start
+    print_timings(stages, model_timings, budgets, wall, n_train)
     print("\n>>> Training Complete!")
+    return {"stages": stages, "models": model_timings, "wall": wall, "train_rows": n_train}
 
 
-if __name__ == "__main__":
+def build_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("--data", required=True)
     parser.add_argument("--out_dir", default="models")
-    args = parser.parse_args()
+    parser.add_argument("--logreg_threshold", type=float, default=0.5)
+    parser.add_argument("--rf_threshold", type=float, default=0.5)
+    parser.add_argument("--resample", choices=list(RESAMPLE_STRATEGIES), default="smote",
+                        help="Class-imbalance handling before the train / test split")
+    parser.add_argument("--models", default="logreg,rf", help="Comma-separated models to train")
+    parser.add_argument("--parallel", type=int, default=2,
+                        help="Model jobs run at once on a process pool (1 = one after the other)")
+    parser.add_argument("--cores", type=int, default=0,
+                        help="Cores split between concurrent jobs (default: all)")
+    parser.add_argument("--search", choices=["grid", "halving"], default="grid",
+                        help="LogReg hyperparameter search: full grid or successive halving")
+    parser.add_argument("--cache_transformers", action="store_true",
+                        help="Cache fitted pipeline transformers across LogReg search candidates")
+    parser.add_argument("--rf_search", action="store_true",
+                        help="Search depth / leaf size / max_features / n_estimators with warm-started forests")
+    parser.add_argument("--cascade_recall_loss", type=float, default=0.01,
+                        help="Recall the cascade may lose versus the forest when calibrating its band")
+    parser.add_argument("--cascade_precision_loss", type=float, default=0.01,
+                        help="Share of extra false positives the cascade may add versus the forest")
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="Rows per CSV chunk; > 0 trains out-of-core with partial_fit")
+    parser.add_argument("--epochs", type=int, default=3, help="Passes over the data in streaming mode")
+    parser.add_argument("--checkpoint_every", type=int, default=0,
+                        help="Streaming mode: checkpoint to <out_dir>/logreg.ckpt.pkl every N chunks")
+    parser.add_argument("--resume", action="store_true", help="Streaming mode: continue from the checkpoint")
+    parser.add_argument("--update", default=None,
+                        help="Streaming model to continue training on --data (new labeled rows, '-' = stdin)")
+    parser.add_argument("--cache_dir", default="data_cache", help="Preprocessed dataset cache")
+    parser.add_argument("--rebuild-cache", dest="rebuild_cache", action="store_true",
+                        help="Ignore and overwrite the cached preprocessed dataset")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
     main(args)
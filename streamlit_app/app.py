@@ -1,11 +1,23 @@
 import streamlit as st
-import requests
 import numpy as np
 import pandas as pd
 import time
 import math
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
 from typing import List
 
+# Repo root on the path so the local engine can import backend/
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bulk_client import BulkSummary, ChunkSizer, make_session, score_chunks
+
 # --------------------------------------------
 # PAGE CONFIG
 # --------------------------------------------
@@ -168,19 +180,58 @@ def render_gauge(percent: float, size: int = 200):
 # --------------------------------------------
 # API ENDPOINTS
 # --------------------------------------------
-API = "https://credit-card-fraud-detection-ml-webapp.onrender.com"
-API_SINGLE = f"{API}/predict"
-API_BATCH = f"{API}/predict-batch"
-API_MODELS = f"{API}/get-models"
+# FRAUD_API_URL points the app at another backend (e.g. http://localhost:8000);
+# it is also editable in the sidebar
+DEFAULT_API = os.getenv("FRAUD_API_URL", "https://credit-card-fraud-detection-ml-webapp.onrender.com")
+
+# Bulk upload: chunks in flight at once and attempts per chunk
+BULK_PARALLELISM = 4
+BULK_ATTEMPTS = 3
+
+@st.cache_resource
+def get_session():
+    # One keep-alive connection pool shared by every rerun
+    return make_session(pool_size=BULK_PARALLELISM)
 
-def get_models():
+SESSION = get_session()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_models(api):
+    # Cached per URL: reruns from widget changes no longer block on the network
     try:
-        r = requests.get(API_MODELS, timeout=4)
+        r = SESSION.get(f"{api}/get-models", timeout=4)
         return r.json().get("available_models", ["rf", "logreg"])
     except:
         return ["rf", "logreg"]
 
-MODELS = get_models()
+# --------------------------------------------
+# LOCAL ENGINE
+# --------------------------------------------
+# Scores in-process through backend/predictor.py: no network round-trips,
+# works offline. Artifacts come from FRAUD_MODEL_DIR (default models/ at the
+# repo root, where src/train.py writes and the backend reads), preferring the
+# fused linear export like the backend does.
+LOCAL_MODEL_DIR = Path(os.getenv("FRAUD_MODEL_DIR", ROOT / "models"))
+LOCAL_MODELS = ["rf", "logreg"]
+
+def local_model_path(mdl):
+    for name in (f"{mdl}.fused.pkl", f"{mdl}.pkl"):
+        if (LOCAL_MODEL_DIR / name).exists():
+            return LOCAL_MODEL_DIR / name
+    return None
+
+def local_models():
+    return [m for m in LOCAL_MODELS if local_model_path(m) is not None]
+
+@st.cache_resource(max_entries=4)
+def load_local_model(path, mtime):
+    # mtime in the key: a retrained artifact is picked up on the next run
+    from backend.predictor import ModelLoader
+    return ModelLoader(path)
+
+def get_local_model(mdl):
+    path = local_model_path(mdl)
+    return load_local_model(str(path), path.stat().st_mtime)
 
 # --------------------------------------------
 # FEATURE ORDER & PREP
@@ -212,23 +263,70 @@ def prep_df(df):
     out.columns = ORDER
     return out.astype(float)
 
+# --------------------------------------------
+# UPLOAD CACHE + RESULT SPOOL
+# --------------------------------------------
+# Uploads are keyed by a content hash computed once per uploaded file. Only
+# a small preview is parsed up front; bulk scoring reads, aligns, scores and
+# writes BULK_READ_ROWS rows at a time, spooling results to a temp file so
+# memory stays flat in the file size.
+UPLOAD_CACHE_ENTRIES = 2
+BULK_READ_ROWS = 100_000
+
+def upload_digest(up):
+    cached = st.session_state.get("upload_digest")
+    if cached is not None and cached[0] == up.file_id:
+        return cached[1]
+    with up.getbuffer() as buf:
+        digest = hashlib.blake2b(buf, digest_size=16).hexdigest()
+    st.session_state.upload_digest = (up.file_id, digest)
+    return digest
+
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, show_spinner=False)
+def load_preview(digest, _up):
+    _up.seek(0)
+    return pd.read_csv(_up, nrows=5)
+
+def new_spool(compress):
+    # One result file per session: the previous run's spool is removed
+    old = st.session_state.bulk
+    if old is not None and os.path.exists(old["path"]):
+        os.remove(old["path"])
+    fd, path = tempfile.mkstemp(prefix="fraud-predictions-", suffix=".csv.gz" if compress else ".csv")
+    os.close(fd)
+    return path
+
+def risk_labels(probs, sensitivity):
+    pct = probs * 100
+    return np.select([pct >= sensitivity, pct >= sensitivity * 0.6], ["HIGH", "ELEVATED"], "LOW")
+
 # --------------------------------------------
 # POST REQUEST FUNCTIONS
 # --------------------------------------------
 def single_api(vec, mdl):
     try:
-        r = requests.post(f"{API_SINGLE}?model={mdl}", json={"features":vec}, timeout=10)
+        r = SESSION.post(f"{API}/predict?model={mdl}", json={"features":vec}, timeout=10)
         return r.json(), r.status_code
     except Exception as e:
         return {"error":str(e)}, 500
 
 def batch_api(batch, mdl):
+    # Runs in worker threads: raise on failure so the chunk is retried, never touch st.*
+    r = SESSION.post(f"{API}/predict-batch?model={mdl}", json={"features":batch.tolist()}, timeout=300)
+    r.raise_for_status()
+    out = r.json()
+    return out["predictions"], out["probabilities"]
+
+def single_local(vec, mdl):
     try:
-        r = requests.post(f"{API_BATCH}?model={mdl}", json={"features":batch}, timeout=300)
-        return r.json(), r.status_code
+        return {"model_used": mdl, **get_local_model(mdl).predict(vec)}, 200
     except Exception as e:
         return {"error":str(e)}, 500
 
+def batch_local(loader, batch):
+    out = loader.predict_batch(batch)
+    return out["predictions"], out["probabilities"]
+
 # --------------------------------------------
 # HERO (NO EMPTY BLOCKS)
 # --------------------------------------------
@@ -240,6 +338,16 @@ st.markdown("</div>", unsafe_allow_html=True)
 # --------------------------------------------
 # SIDEBAR
 # --------------------------------------------
+engine = st.sidebar.radio("Engine", ["API", "Local"], horizontal=True)
+if engine == "API":
+    API = st.sidebar.text_input("API base URL", DEFAULT_API).strip().rstrip("/")
+    MODELS = get_models(API)
+else:
+    MODELS = local_models()
+    if not MODELS:
+        st.error(f"No model artifacts found in {LOCAL_MODEL_DIR}. Train one with src/train.py or switch to the API engine.")
+        st.stop()
+
 model = st.sidebar.radio("Model", MODELS)
 mode = st.sidebar.selectbox("Mode", ["Single Prediction", "Bulk CSV Prediction"])
 sensitivity = st.sidebar.slider("Risk Sensitivity %", 30, 90, 60)
@@ -252,6 +360,9 @@ if "logs" not in st.session_state:
     st.session_state.logs = []
 if "last_prob" not in st.session_state:
     st.session_state.last_prob = None
+# Last bulk run: scores are kept so the sensitivity slider only re-thresholds them
+if "bulk" not in st.session_state:
+    st.session_state.bulk = None
 
 # --------------------------------------------
 # LAYOUT
@@ -283,7 +394,7 @@ with left:
 
         if st.button("Run Prediction"):
             vec = [f1,f2,f3,f4,f5,f6] + [0]*24
-            out,code = single_api(vec,model)
+            out,code = (single_api if engine == "API" else single_local)(vec,model)
 
             if code != 200:
                 st.error("Backend error. Try again.")
@@ -319,47 +430,98 @@ with left:
 
         up = st.file_uploader("Upload", type=["csv"])
         if up:
-            df = pd.read_csv(up)
-            st.dataframe(df.head())
+            digest = upload_digest(up)
+            st.dataframe(load_preview(digest, up))
 
+            # A stored run is shown only for the same file, engine, backend and model
+            source = API if engine == "API" else str(local_model_path(model))
+            run_key = (digest, engine, source, model)
+
+            compress = st.checkbox("Gzip the results file", False)
             if st.button("Run Bulk Prediction"):
-                feat = prep_df(df)
-                preds=[]
-                probs=[]
-                n=len(feat)
                 pbar=st.progress(0)
 
-                for i in range(math.ceil(n/4000)):
-                    s=i*4000
-                    e=min((i+1)*4000,n)
-                    batch=feat.iloc[s:e].values.tolist()
-                    out,code=batch_api(batch,model)
-                    if code!=200:
-                        st.error("Batch error")
-                        break
-                    preds+=out["predictions"]
-                    probs+=out["probabilities"]
-                    pbar.progress(e/n)
-
-                df["prediction"]=preds
-                df["fraud_probability"]=probs
-                st.dataframe(df.head())
+                if engine == "API":
+                    score = lambda X: batch_api(X, model)
+                    parallelism, attempts = BULK_PARALLELISM, BULK_ATTEMPTS
+                else:
+                    # Resolved here: st.cache_resource is not called from worker threads
+                    loader = get_local_model(model)
+                    score = lambda X: batch_local(loader, X)
+                    parallelism, attempts = 1, 1
+                # One sizer for the whole file, so the learned chunk size carries over
+                sizer = ChunkSizer() if engine == "API" else ChunkSizer(initial=BULK_READ_ROWS, max_rows=BULK_READ_ROWS)
+
+                summary = BulkSummary()
+                path = new_spool(compress)
+                preview = None
+                up.seek(0)
+                with (gzip.open(path, "wt", compresslevel=1, newline="") if compress else open(path, "w", newline="")) as out:
+                    for i, chunk in enumerate(pd.read_csv(up, chunksize=BULK_READ_ROWS)):
+                        preds, probs, failed, errors = score_chunks(
+                            score,
+                            prep_df(chunk).to_numpy(),
+                            sizer,
+                            parallelism=parallelism,
+                            max_attempts=attempts,
+                        )
+                        st.session_state.logs += [{"batch_error": e} for e in errors]
+                        summary.update(preds, probs)
+
+                        # Results are aligned by row; rows whose chunk kept failing stay empty
+                        chunk = chunk.assign(
+                            prediction=pd.array(np.where(np.isnan(preds), None, preds), dtype="Int64"),
+                            fraud_probability=probs,
+                        )
+                        chunk.to_csv(out, header=i == 0, index=False)
+                        if preview is None:
+                            preview = chunk.head()
+                        pbar.progress(min(1.0, up.tell() / max(up.size, 1)))
+                pbar.progress(1.0)
+
+                st.session_state.bulk = {
+                    "key": run_key,
+                    "summary": summary,
+                    "attempts": attempts,
+                    "preview": preview,
+                    "path": path,
+                }
+
+            bulk = st.session_state.bulk
+            if bulk is not None and bulk["key"] == run_key:
+                summary = bulk["summary"]
+
+                if summary.failed:
+                    st.warning(f"{summary.failed} of {summary.rows} rows could not be scored after {bulk['attempts']} attempt(s); they are left empty.")
+
+                preview = bulk["preview"]
+                if preview is not None:
+                    st.dataframe(preview.assign(risk=risk_labels(preview["fraud_probability"].to_numpy(), sensitivity)))
+
+                # Sensitivity only re-thresholds the stored probability histogram
+                high, elevated = summary.risk_counts(sensitivity)
+                st.markdown(f"<div class='muted'>At {sensitivity}% sensitivity: {high} high risk · {elevated} elevated</div>", unsafe_allow_html=True)
 
                 # FINAL DATASET JUDGEMENT
-                fraud_rate = sum(preds)/len(preds)
+                fraud_rate = summary.fraud_rate
 
-                if fraud_rate == 0:
+                if not summary.scored:
+                    st.error("Final dataset judgement: No rows could be scored — check the backend and retry.")
+                elif fraud_rate == 0:
                     st.success("Final dataset judgement: No fraud indicators — dataset clean.")
                 elif fraud_rate < 0.10:
                     st.info("Final dataset judgement: Operating normal — minor anomalies only.")
                 else:
                     st.error("Final dataset judgement: Dataset shows risky profile — review advised.")
 
+                # Read from the spool only when the button is clicked
+                path = bulk["path"]
+                gz = path.endswith(".gz")
                 st.download_button(
                     "Download Results",
-                    df.to_csv(index=False).encode("utf-8"),
-                    "predictions.csv",
-                    "text/csv"
+                    lambda: Path(path).read_bytes(),
+                    "predictions.csv.gz" if gz else "predictions.csv",
+                    "application/gzip" if gz else "text/csv"
                 )
 
         st.markdown("</div>", unsafe_allow_html=True)
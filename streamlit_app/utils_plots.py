@@ -1,10 +1,30 @@
+import sys
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.metrics import roc_curve, auc, confusion_matrix, precision_recall_curve
+from sklearn.metrics import confusion_matrix
+
+# Repo root on the path for src/evaluation.py
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.evaluation import ScoreHistogram
 
-def plot_roc_curve(y_true, y_prob):
-    fpr, tpr, _ = roc_curve(y_true, y_prob)
-    roc_auc = auc(fpr, tpr)
+# Curves are drawn from binned score counts (src/evaluation.py) and capped at
+# this many points, so plotting cost does not grow with the number of rows.
+# Pass `hist` (e.g. StreamingEvaluator.load("rf_eval.npz").hist) to plot
+# results accumulated elsewhere instead of y_true / y_prob arrays.
+MAX_POINTS = 500
+
+def _histogram(y_true, y_prob, hist):
+    return hist if hist is not None else ScoreHistogram().update(y_true, y_prob)
+
+def plot_roc_curve(y_true=None, y_prob=None, hist=None):
+    hist = _histogram(y_true, y_prob, hist)
+    fpr, tpr, _ = hist.roc(max_points=MAX_POINTS)
+    roc_auc = hist.roc_auc()
 
     fig, ax = plt.subplots()
     ax.plot(fpr, tpr, label=f"AUC = {roc_auc:.3f}")
@@ -15,8 +35,9 @@ def plot_roc_curve(y_true, y_prob):
     ax.legend()
     return fig
 
-def plot_confusion_matrix(y_true, y_pred):
-    cm = confusion_matrix(y_true, y_pred)
+def plot_confusion_matrix(y_true=None, y_pred=None, hist=None, threshold=0.5):
+    # From a histogram the matrix is taken at `threshold` (score > threshold, as the API labels)
+    cm = hist.confusion(threshold) if hist is not None else confusion_matrix(y_true, y_pred)
     fig, ax = plt.subplots()
     sns.heatmap(cm, annot=True, fmt="d", cmap="Blues", ax=ax)
     ax.set_xlabel("Predicted")
@@ -24,11 +45,13 @@ def plot_confusion_matrix(y_true, y_pred):
     ax.set_title("Confusion Matrix")
     return fig
 
-def plot_precision_recall(y_true, y_prob):
-    precision, recall, _ = precision_recall_curve(y_true, y_prob)
+def plot_precision_recall(y_true=None, y_prob=None, hist=None):
+    hist = _histogram(y_true, y_prob, hist)
+    precision, recall, _ = hist.precision_recall(max_points=MAX_POINTS)
     fig, ax = plt.subplots()
-    ax.plot(recall, precision)
+    ax.plot(recall, precision, label=f"AP = {hist.average_precision():.3f}")
     ax.set_xlabel("Recall")
     ax.set_ylabel("Precision")
     ax.set_title("Precision-Recall Curve")
+    ax.legend()
     return fig
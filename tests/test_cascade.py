@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.cascade import calibrate_band, cascade_predict, export_cascade, recall_loss
+
+
+class FixedScores:
+    """Stand-in model: column 0 of X is a row index into fixed fraud probabilities."""
+
+    def __init__(self, probs):
+        self.probs = np.asarray(probs, dtype=np.float64)
+
+    def predict_proba(self, X):
+        p = self.probs[np.asarray(X)[:, 0].astype(np.int64)]
+        return np.column_stack([1 - p, p])
+
+
+@pytest.fixture(scope="module")
+def scores():
+    rng = np.random.default_rng(0)
+    y = (rng.random(20_000) < 0.05).astype(int)
+    p_screen = np.clip(0.4 * y + 0.6 * rng.random(len(y)), 0, 1)
+    esc_pred = np.where(rng.random(len(y)) < 0.9, y, 1 - y)
+    return p_screen, esc_pred, y
+
+
+BUDGETS = [
+    (0.01, 0.01), (0.0, 0.0), (0.01, 0.5),
+    # Conflicting: the recall cut lands above the precision cut
+    (0.5, 0.0),
+]
+
+
+@pytest.mark.parametrize("max_recall_loss, max_precision_loss", BUDGETS)
+def test_recall_budget_met(scores, max_recall_loss, max_precision_loss):
+    p_screen, esc_pred, y = scores
+    low, high = calibrate_band(p_screen, esc_pred, y, max_recall_loss, max_precision_loss)
+    assert low <= high
+    pred, _ = cascade_predict(p_screen, esc_pred, low, high)
+    assert recall_loss(y, esc_pred, pred) <= max_recall_loss
+
+
+def test_conflicting_budgets_collapse_at_high(scores):
+    p_screen, esc_pred, y = scores
+    _, high_only = calibrate_band(p_screen, esc_pred, y, 1.0, 0.0)
+    low, high = calibrate_band(p_screen, esc_pred, y, 0.5, 0.0)
+    assert low == high == high_only
+    assert not cascade_predict(p_screen, esc_pred, low, high)[1].any()
+
+
+@pytest.mark.parametrize("max_recall_loss, max_precision_loss", BUDGETS)
+def test_export_records_recall_loss(scores, tmp_path, max_recall_loss, max_precision_loss):
+    p_screen, esc_pred, y = scores
+    X = np.arange(len(y))[:, None]
+    out = tmp_path / "cascade.json"
+    # Escalation model whose labels at the 0.5 threshold are esc_pred
+    config = export_cascade(FixedScores(p_screen), FixedScores(0.01 + 0.98 * esc_pred), X, y, out,
+                            max_recall_loss=max_recall_loss, max_precision_loss=max_precision_loss)
+
+    assert json.loads(out.read_text()) == config
+    pred, _ = cascade_predict(p_screen, esc_pred, config["low"], config["high"])
+    assert config["recall_loss"] == pytest.approx(recall_loss(y, esc_pred, pred))
+    assert config["recall_budget_met"] is (config["recall_loss"] <= max_recall_loss)
+    # Met, or else reported as not met
+    assert config["recall_budget_met"]
@@ -0,0 +1,73 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from backend.linear import FusedLinearScorer, fuse_linear_pipeline
+from src.fuse import export_fused
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 30)) * rng.uniform(0.5, 50, size=30)
+    y = (X[:, :3].sum(axis=1) + rng.normal(scale=5, size=600) > 0).astype(int)
+    return X, y
+
+
+PIPELINES = {
+    "pca_logreg": lambda: Pipeline([
+        ("pca", PCA(n_components=10)),
+        ("clf", LogisticRegression(max_iter=1000)),
+    ]),
+    "scaler_whitened_pca_logreg": lambda: Pipeline([
+        ("scaler", StandardScaler()),
+        ("pca", PCA(n_components=8, whiten=True)),
+        ("clf", LogisticRegression(max_iter=1000)),
+    ]),
+    "ipca_sgd": lambda: Pipeline([
+        ("pca", IncrementalPCA(n_components=10, batch_size=200)),
+        ("clf", SGDClassifier(loss="log_loss", random_state=0)),
+    ]),
+}
+
+
+@pytest.mark.parametrize("name", sorted(PIPELINES))
+def test_fused_matches_pipeline(data, name):
+    X, y = data
+    pipe = PIPELINES[name]().fit(X, y)
+    fused = fuse_linear_pipeline(pipe)
+
+    assert isinstance(fused, FusedLinearScorer)
+    np.testing.assert_allclose(fused.predict_proba(X), pipe.predict_proba(X), rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(fused.predict(X), pipe.predict(X))
+
+
+def test_decision_threshold_carried_over(data):
+    X, y = data
+    pipe = PIPELINES["pca_logreg"]().fit(X, y)
+    pipe.decision_threshold_ = 0.3
+    assert fuse_linear_pipeline(pipe).decision_threshold_ == 0.3
+
+
+def test_export_fused_round_trip(data, tmp_path):
+    X, y = data
+    pipe = PIPELINES["ipca_sgd"]().fit(X, y)
+    out = tmp_path / "model.fused.pkl"
+    export_fused(pipe, X[:100], out)
+
+    loaded = joblib.load(out)
+    np.testing.assert_allclose(loaded.predict_proba(X), pipe.predict_proba(X), rtol=1e-9, atol=1e-12)
+
+
+def test_rejects_wrong_width_and_nonlinear_steps(data):
+    X, y = data
+    fused = fuse_linear_pipeline(PIPELINES["pca_logreg"]().fit(X, y))
+    with pytest.raises(ValueError):
+        fused.predict_proba(X[:, :5])
+    with pytest.raises(ValueError):
+        fuse_linear_pipeline(Pipeline([("clf", RandomForestClassifier(n_estimators=2))]).fit(X, y))
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from src.preprocess import FEATURE_COLUMNS, RowDeduplicator, StreamingPreprocessor
+
+
+def test_dedup_all_duplicate_chunk():
+    rng = np.random.default_rng(0)
+    first = rng.random((200, 30), dtype=np.float32)
+    dedup = RowDeduplicator()
+
+    assert dedup.new_rows(first).all()
+    assert not dedup.new_rows(first).any()
+    assert not dedup.new_rows(first[::-1]).any()
+
+    fresh = rng.random((50, 30), dtype=np.float32)
+    mask = dedup.new_rows(np.vstack([fresh, first[:10], fresh[:5]]))
+    np.testing.assert_array_equal(mask, np.r_[np.ones(50, bool), np.zeros(15, bool)])
+    assert dedup.n_unique == 250
+
+
+def test_streaming_matches_drop_duplicates(tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.random((1000, 30), dtype=np.float32), columns=FEATURE_COLUMNS)
+    df["Class"] = (rng.random(1000) < 0.1).astype(np.float32)
+    # Second chunk repeats the first, the rest are partly repeated
+    df = pd.concat([df.iloc[:300], df.iloc[:300], df.iloc[300:], df.sample(200, random_state=2)])
+    path = tmp_path / "dup.csv"
+    df.to_csv(path, index=False)
+
+    expected = pd.read_csv(path, dtype=np.float32).drop_duplicates().to_numpy()
+    prep = StreamingPreprocessor(chunksize=300).fit(path)
+    assert prep.n_rows_ == len(expected)
+    for _ in range(2):
+        got = pd.concat(prep.iter_unique(path)).to_numpy()
+        np.testing.assert_array_equal(got, expected)
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import recall_score, roc_auc_score
+
+from backend.linear import fuse_linear_pipeline
+from benchmarks.synthetic import synthetic_transactions
+from src.preprocess import StreamingPreprocessor
+from src.train import train_logreg_streaming
+
+
+def test_streaming_logreg_learns_separable_stream(tmp_path):
+    # Same generator and seed as the benchmarks, fraud shifted in V1..V4
+    path = tmp_path / "stream.csv"
+    synthetic_transactions(20_000, fraud_rate=0.02).to_csv(path, index=False)
+
+    prep = StreamingPreprocessor(chunksize=5000).fit(path)
+    pipe = train_logreg_streaming(prep, path, epochs=2)
+
+    X, y = zip(*prep.iter_batches(path))
+    X, y = pd.concat(X), np.concatenate(y)
+    probs = pipe.predict_proba(X)[:, 1]
+    assert roc_auc_score(y, probs) > 0.99
+    assert recall_score(y, probs > 0.5) > 0.9
+    # Not flagging everything either
+    assert (probs > 0.5).mean() < 0.1
+
+    # Still folds into one weight vector for serving
+    fused = fuse_linear_pipeline(pipe)
+    np.testing.assert_allclose(fused.predict_proba(X)[:, 1], probs, rtol=1e-9, atol=1e-12)